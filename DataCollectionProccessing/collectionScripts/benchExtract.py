@@ -0,0 +1,85 @@
+import argparse
+import contextlib
+import io
+import re
+import sys
+import time
+from pathlib import Path
+
+from DataCollectionProccessing.collectionScripts.fastExtract import UnsupportedPage, extractDataFast
+from DataCollectionProccessing.collectionScripts.multithreadedGatheringData import CSV_DIR, extractData, parsePage
+from DataCollectionProccessing.collectionScripts.stubServer import synthetic_page
+
+# Checks that parsePage returns exactly what extractData returns and times
+# both, on saved pages (--pages) and/or synthetic ones. The synthetic set
+# includes pages with the kinds of noise extractData reports as errors, so
+# both the fast path and its fallback are covered.
+
+
+def synthetic_fixtures(count):
+    with open(CSV_DIR / "fragrance_list_brands.csv", encoding="utf-8") as f:
+        links = [line.rsplit(",", 1)[-1].strip() for line in f.readlines()[1:count + 1]]
+    pages = {}
+    for i, link in enumerate(links):
+        page = synthetic_page(link)
+        if i % 10 == 1:
+            page = synthetic_page(link, rendered=False)
+        elif i % 10 == 2:
+            page = re.sub(r">(<div)", r">\n  \1", page)
+        elif i % 10 == 3:
+            page = page.replace("</span>", "<!-- c --></span>").replace('<div class="accords">', "<script>var a = 1;</script><div class=\"accords\">")
+        elif i % 10 == 4:
+            page = page.replace('<div id="pyramid">', "<div>")
+        pages[link] = page
+    return pages
+
+
+def saved_fixtures(directory):
+    return {p.name: p.read_text(encoding="utf-8") for p in sorted(Path(directory).glob("*.html"))}
+
+
+def timed(extract, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name, page in pages.items():
+            extract(page, name)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare and time extractData against the lxml fast path")
+    parser.add_argument("--pages", help="directory of saved .html pages")
+    parser.add_argument("--synthetic", type=int, default=300, help="number of synthetic pages (0 to skip)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = saved_fixtures(args.pages) if args.pages else {}
+    if args.synthetic:
+        pages.update(synthetic_fixtures(args.synthetic))
+    if not pages:
+        parser.error("no pages to check")
+
+    mismatches, fallbacks = [], 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, page in pages.items():
+            try:
+                extractDataFast(page, name)
+            except UnsupportedPage:
+                fallbacks += 1
+            if parsePage(page, name) != extractData(page, name):
+                mismatches.append(name)
+        slow = timed(extractData, pages, args.repeat)
+        fast = timed(parsePage, pages, args.repeat)
+
+    print(f"{len(pages)} pages, {fallbacks} handed back to extractData, {len(mismatches)} mismatches")
+    print(f"extractData {slow / len(pages) * 1000:.2f} ms/page, parsePage {fast / len(pages) * 1000:.2f} ms/page "
+          f"({slow / fast:.1f}x)")
+    for name in mismatches[:10]:
+        print(f"  mismatch: {name}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
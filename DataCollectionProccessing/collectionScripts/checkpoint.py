@@ -0,0 +1,134 @@
+import csv
+import json
+import os
+import time
+from pathlib import Path
+from urllib.parse import urldefrag
+
+
+def normalize_link(link):
+    return urldefrag(link.strip())[0]
+
+
+def pending_rows(inputFiles, done=()):
+    # Streams (row, link) for the list CSVs in order, skipping links that are
+    # already done and links seen earlier in the same lists.
+    seen = set(done)
+    for inputFile in inputFiles:
+        with open(inputFile, mode="r", newline="", encoding="utf-8") as infile:
+            reader = csv.reader(infile)
+            next(reader)
+            for row in reader:
+                if len(row) < 3:
+                    continue
+                link = normalize_link(row[2])
+                if link in seen:
+                    continue
+                seen.add(link)
+                yield row, link
+
+
+class ScrapeJournal:
+    # Append-only output CSV plus a journal with one JSON line per finished
+    # link. A row is flushed to the output before its link is journaled
+    # together with the output size after it. On reopening, anything in the
+    # output past the last journaled size (a row whose link never made it
+    # into the journal, or a half-written line) is cut off and that link is
+    # fetched again, so every link lands in the output exactly once. Failed
+    # links are journaled too but stay pending, so a rerun retries them. A
+    # .jsonl output gets one JSON record per row and no header.
+
+    def __init__(self, outputFile, headers, journalFile=None, fsync=True):
+        self.outputFile = Path(outputFile)
+        self.journalFile = Path(journalFile) if journalFile else self.outputFile.with_name(self.outputFile.name + ".journal")
+        self.headers = headers
+        self.fsync = fsync
+        self.jsonl = self.outputFile.suffix.lower() == ".jsonl"
+        self.done = set()
+        self.failed = {}
+        self.out = None
+        self.writer = None
+        self.journal = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self):
+        size = self.replay()
+        existing = self.outputFile.stat().st_size if self.outputFile.exists() else 0
+        if size is None and existing:
+            raise FileExistsError(
+                f"{self.outputFile} has no journal ({self.journalFile.name}); move it away or pick another output file"
+            )
+        if size is not None and existing < size:
+            raise RuntimeError(f"{self.outputFile} is shorter than {self.journalFile.name} records; it was modified outside the run")
+        mode = "r+b" if self.outputFile.exists() else "wb"
+        with open(self.outputFile, mode) as f:
+            f.truncate(size or 0)
+
+        self.out = open(self.outputFile, mode="a", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.out)
+        self.journal = open(self.journalFile, mode="a", encoding="utf-8")
+        if size is None:
+            if not self.jsonl:
+                self.writer.writerow(self.headers)
+            self.append({"start": time.time(), "size": self.sync_output()})
+        return self
+
+    def replay(self):
+        # Returns the output size the journal vouches for, or None if there
+        # is no journal yet. A torn last line is dropped from the journal.
+        if not self.journalFile.exists():
+            return None
+        size, good = None, 0
+        with open(self.journalFile, mode="rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                entry = json.loads(line)
+                good += len(line)
+                if "size" in entry:
+                    size = entry["size"]
+                if "link" in entry:
+                    if "error" in entry:
+                        self.failed[entry["link"]] = entry["error"]
+                    else:
+                        self.done.add(entry["link"])
+                        self.failed.pop(entry["link"], None)
+        with open(self.journalFile, mode="r+b") as f:
+            f.truncate(good)
+        return size
+
+    def sync_output(self):
+        self.out.flush()
+        if self.fsync:
+            os.fsync(self.out.fileno())
+        return os.fstat(self.out.fileno()).st_size
+
+    def append(self, entry):
+        self.journal.write(json.dumps(entry) + "\n")
+        self.journal.flush()
+        if self.fsync:
+            os.fsync(self.journal.fileno())
+
+    def record(self, link, values):
+        if self.jsonl:
+            self.out.write(json.dumps(values, ensure_ascii=False) + "\n")
+        else:
+            self.writer.writerow(values)
+        self.append({"link": link, "size": self.sync_output()})
+        self.done.add(link)
+        self.failed.pop(link, None)
+
+    def fail(self, link, error):
+        self.append({"link": link, "error": str(error)})
+        self.failed[link] = str(error)
+
+    def close(self):
+        for f in (self.out, self.journal):
+            if f is not None:
+                f.close()
+        self.out = self.journal = None
@@ -1,55 +1,57 @@
+import contextlib
 import csv
 import time
+from pathlib import Path
 
 from dotenv import load_dotenv
 import os
 import requests
 
+from DataCollectionProccessing.collectionScripts.checkpoint import ScrapeJournal, pending_rows
 from DataCollectionProccessing.collectionScripts.collectPageData import extractData
+from DataCollectionProccessing.collectionScripts.pageStore import PageStore
+from DataCollectionProccessing.collectionScripts.typedOutput import OUTPUT_HEADERS, append_format, output_row
 
 load_dotenv()
 
 csv_filename = "fragrance_list_brands.csv"
+CSV_DIR = Path(__file__).resolve().parent.parent / "csvData"
+# Every fetched page is kept here for replayPages.py; set it empty to skip.
+page_store = os.getenv("page_store", str(CSV_DIR.parent / "pageStore"))
 
 def fetch(link, api):
     payload = {'api_key': api, 'url': link, 'render':'true'}
     r = requests.get('https://api.scraperapi.com', params=payload)
     return r.text
 
-def countRows(filename):
-    with open(filename, 'r', encoding='utf-8') as f:
-        return sum(1 for _ in enumerate(f))
+def processCsv(inputFiles, outputFile, api):
+    # Appends to outputFile and journals each finished link, so a rerun
+    # skips what is already done. A failed link is logged in the journal and
+    # retried on the next run rather than stopping the run for input. A
+    # .jsonl outputFile gets typed records instead of CSV rows.
+    if isinstance(inputFiles, str):
+        inputFiles = [inputFiles]
 
+    fmt = append_format(outputFile)
+    storeContext = PageStore(page_store) if page_store else contextlib.nullcontext()
+    with ScrapeJournal(outputFile, OUTPUT_HEADERS) as journal, storeContext as store:
+        print(f"{len(journal.done)} links already done")
 
-def processCsv(inputFile, outputFile, api):
-
-    numRows = countRows(inputFile)-1
-
-    with open(inputFile, mode='r', encoding='utf-8') as infile, open(outputFile, mode='w', newline='', encoding='utf-8') as outfile:
-        reader = csv.reader(infile)
-        writer = csv.writer(outfile)
-
-        next(reader)
-
-        outputHeaders = ['name', 'brand', 'accords', 'ratingValue', 'ratingCount', 'seasons', 'timeOfDay', 'gender', 'priceValue', 'notesBreakdown']
-        writer.writerow(outputHeaders)
-        print(outputHeaders)
-
-        for i, row in enumerate(reader):
-            link = row[2]
+        for i, (row, link) in enumerate(pending_rows(inputFiles, journal.done)):
             try:
                 html = fetch(link, api)
+                if store is not None:
+                    store.put(link, html)
                 # with open("test.html", "w", encoding="utf-8") as f:
                 #     f.write(html)
                 extractedData = extractData(html)
-                writer.writerow([extractedData.get(key, "") for key in outputHeaders])
+                journal.record(link, output_row(extractedData, fmt))
             except Exception as e:
                 print(e)
                 print(f"ERROR AT INDEX {i} NAMED {str(row[0:2])}")
-                input("Continue?")
-                writer.writerow([row[0], row[1]])
+                journal.fail(link, e)
 
-            print(f"Completed row {i+1} : {(i+1)/numRows*100}%")
+            print(f"Completed row {i+1} ({len(journal.done)} done, {len(journal.failed)} failed)")
             print("Sleeping...")
             time.sleep(4)
             print("Awake...")
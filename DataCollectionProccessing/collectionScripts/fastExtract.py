@@ -0,0 +1,192 @@
+import lxml.html
+from lxml import etree
+
+# lxml counterpart of extractData: the page is parsed by libxml2 and each
+# field is read with one targeted XPath query instead of BeautifulSoup's
+# pure-Python parser and whole-tree lambda scans. It reproduces extractData's
+# output field for field on pages it recognises. Anything extractData would
+# report as an "ERROR - ..." field (a missing block, stray text between vote
+# rows, ...) raises UnsupportedPage instead, so callers can hand that page to
+# extractData and keep its exact error strings.
+
+SEASONS_AND_TIMES_OF_DAY = ["winter", "spring", "summer", "fall", "day", "night"]
+EXTRA_POLLING = ["gender", "price value"]
+# BeautifulSoup keeps these as separate string types that get_text() skips.
+SKIPPED_TEXT = {"script", "style", "template"}
+
+
+class UnsupportedPage(Exception):
+    pass
+
+
+def has_class(token):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {token} ')"
+
+
+DESCRIPTION = etree.XPath("(//div[@itemprop='description'])[1]")
+ACCORD_BARS = etree.XPath(f"//*[{has_class('accord-bar')}]")
+RATING_VALUE = etree.XPath("(//span[@itemprop='ratingValue'])[1]")
+RATING_COUNT = etree.XPath("(//span[@itemprop='ratingCount'])[1]")
+LEGEND_SPANS = etree.XPath(f"//span[{has_class('vote-button-legend')}]")
+SPANS = etree.XPath("//span")
+PYRAMID = etree.XPath("(//div[@id='pyramid'])[1]")
+
+
+def text(el, strip=False):
+    # Tag.text / Tag.get_text(strip=True) for an lxml element.
+    parts = []
+
+    def walk(node):
+        if node.text is not None:
+            parts.append(node.text)
+        for child in node:
+            if isinstance(child.tag, str) and child.tag not in SKIPPED_TEXT:
+                walk(child)
+            if child.tail is not None:
+                parts.append(child.tail)
+
+    walk(el)
+    if strip:
+        return "".join(s.strip() for s in parts)
+    return "".join(parts)
+
+
+def find(el, tag, cls=None, **attrs):
+    # Tag.find: first descendant in document order. A class with spaces
+    # has to match the whole attribute, otherwise any one class does.
+    for node in el.iterdescendants(tag):
+        if cls is not None:
+            value = node.get("class")
+            if value is None or (cls != value if " " in cls else cls not in value.split()):
+                continue
+        if all(node.get(k) == v for k, v in attrs.items()):
+            return node
+    raise UnsupportedPage(f"no <{tag}> below <{el.tag}>")
+
+
+def parent(el):
+    up = el.getparent()
+    if up is None:
+        raise UnsupportedPage(f"<{el.tag}> has no parent")
+    return up
+
+
+def element_children(el):
+    # Iterating a Tag also yields its text nodes and comments, which
+    # extractData's loops fail on.
+    if el.text is not None or any(not isinstance(c.tag, str) or c.tail is not None for c in el):
+        raise UnsupportedPage(f"<{el.tag}> has text between its children")
+    return list(el)
+
+
+def width(style):
+    return float(style.split("width:")[-1].split(";")[0].strip().replace("%", "")) / 100
+
+
+def extractDataFast(html, fragrance_name):
+    try:
+        root = lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError) as e:
+        raise UnsupportedPage(str(e)) from e
+
+    description = DESCRIPTION(root)
+    if not description:
+        raise UnsupportedPage("no description")
+    bold = list(find(description[0], "p").iterdescendants("b"))[0:2]
+    if len(bold) < 2:
+        raise UnsupportedPage("description without name and brand")
+    name, brand = text(bold[0]), text(bold[1])
+
+    accords = {}
+    try:
+        for bar in ACCORD_BARS(root):
+            style = bar.get("style", "")
+            if "width" in style:
+                accords[text(bar, strip=True)] = width(style)
+    except ValueError as e:
+        raise UnsupportedPage(f"accord width: {e}") from e
+
+    rating_value = RATING_VALUE(root)
+    rating_value = text(rating_value[0], strip=True) if rating_value else None
+    rating_count = RATING_COUNT(root)
+    rating_count = text(rating_count[0], strip=True) if rating_count else None
+
+    seasons = {}
+    timeOfDay = {}
+    for span in LEGEND_SPANS(root):
+        label = text(span).strip().lower()
+        if label not in SEASONS_AND_TIMES_OF_DAY:
+            continue
+        chart = find(parent(parent(span)), "div", cls="voting-small-chart-size")
+        bar = find(find(chart, "div"), "div")
+        style = bar.get("style", "")
+        if "width" in style:
+            try:
+                value = width(style)
+            except ValueError as e:
+                raise UnsupportedPage(f"{label} width: {e}") from e
+            if label in ["day", "night"]:
+                timeOfDay[label] = value
+            else:
+                seasons[label] = value
+
+    gender = {}
+    priceValue = {}
+    for span in SPANS(root):
+        label = text(span).strip().lower()
+        if label not in EXTRA_POLLING:
+            continue
+        stats = find(parent(parent(span)), "div", style="margin-top: 1.5rem;")
+        for child in element_children(stats):
+            catType = text(find(find(child, "div", cls="cell small-5 medium-5 large-5"), "span")).strip()
+            try:
+                numVotes = int(text(find(find(child, "div", cls="cell small-1 medium-1 large-1"), "span")).strip())
+            except ValueError as e:
+                raise UnsupportedPage(f"{label} votes: {e}") from e
+            if label == "gender":
+                gender[catType] = numVotes
+            elif label == "price value":
+                priceValue[catType] = numVotes
+
+    pyramid = PYRAMID(root)
+    if not pyramid:
+        raise UnsupportedPage("no notes pyramid")
+    pyramid = find(find(pyramid[0], "div", cls="cell"), "div")
+    # extractData's class_=lambda x: x != "strike-title" only skips divs
+    # whose class is exactly that one name.
+    pyramid = next(
+        (d for d in pyramid.iterdescendants("div") if (d.get("class") or "").split() != ["strike-title"]), None
+    )
+    if pyramid is None:
+        raise UnsupportedPage("empty notes pyramid")
+    breakdown = [
+        child
+        for child in element_children(pyramid)
+        if child.get("style") != "display: flex; justify-content: center;"
+        and not {"text-center", "notes-box"}.intersection((child.get("class") or "").split())
+    ]
+
+    def notes(block):
+        return list({text(parent(a), strip=True) for a in block.iterdescendants("a")})
+
+    topnotes, midnotes, bottomnotes = [], [], []
+    if len(breakdown) == 6:
+        topnotes, midnotes, bottomnotes = notes(breakdown[1]), notes(breakdown[3]), notes(breakdown[5])
+    elif len(breakdown) == 1:
+        topnotes = notes(breakdown[0])
+
+    output = {
+        "name": name,
+        "brand": brand,
+        "accords": accords,
+        "ratingValue": rating_value,
+        "ratingCount": rating_count,
+        "seasons": seasons,
+        "timeOfDay": timeOfDay,
+        "gender": gender,
+        "priceValue": priceValue,
+        "notesBreakdown": {"topnotes": topnotes, "midnotes": midnotes, "bottomnotes": bottomnotes},
+    }
+
+    print(f"[extractData] Final output for {fragrance_name}: {output}")
+    return output
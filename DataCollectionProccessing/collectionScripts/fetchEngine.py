@@ -0,0 +1,128 @@
+import asyncio
+import random
+
+import httpx
+
+PROXY_ENDPOINT = "https://api.scraperapi.com"
+READY_MARKER = 'itemprop="description"'
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    pass
+
+
+class FetchEngine:
+    # Fetches pages through the proxy API on one pooled asyncio client. At
+    # most `concurrency` requests are in flight and the pool is sized to
+    # match, so every slot reuses a keep-alive connection instead of paying
+    # a new TCP/TLS handshake per page. A page is retried when the request
+    # fails or times out, when the proxy answers with a retryable status, or
+    # when the page came back without the rendered description. Retries wait
+    # with exponential backoff and full jitter outside the concurrency limit,
+    # so a failing page neither holds a slot nor retries in lockstep.
+
+    def __init__(self, api_key, endpoint=PROXY_ENDPOINT, concurrency=18, timeout=70.0, max_retries=3,
+                 backoff_base=1.0, backoff_max=30.0, render=True, ready_marker=READY_MARKER, seed=None):
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.render = render
+        self.ready_marker = ready_marker
+        self.random = random.Random(seed)
+        self.client = None
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "not_ready": 0}
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        self.client = None
+
+    def backoff(self, attempt):
+        return self.random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def params(self, link):
+        params = {"api_key": self.api_key, "url": link}
+        if self.render:
+            params.update(render="true", wait_seconds="3")
+        return params
+
+    async def fetch(self, link):
+        # A page that never shows the ready marker is still returned, as
+        # before; FetchError means no attempt produced a usable response.
+        html, error = None, None
+        for attempt in range(1, self.max_retries + 1):
+            async with self.semaphore:
+                self.stats["requests"] += 1
+                try:
+                    response = await self.client.get(self.endpoint, params=self.params(link))
+                    if response.status_code in RETRY_STATUSES:
+                        error = FetchError(f"HTTP {response.status_code} for {link}")
+                    else:
+                        response.raise_for_status()
+                        html, error = response.text, None
+                        if self.ready_marker is None or self.ready_marker in html:
+                            return html
+                        self.stats["not_ready"] += 1
+                except httpx.HTTPStatusError as e:
+                    self.stats["failures"] += 1
+                    raise FetchError(f"HTTP {e.response.status_code} for {link}") from e
+                except httpx.TransportError as e:
+                    error = FetchError(f"{type(e).__name__} for {link}: {e}")
+
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                delay = self.backoff(attempt)
+                print(f"[fetch] Attempt {attempt} for {link} failed ({error or 'not rendered'}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        if html is not None:
+            print(f"[fetch] Max retries reached for {link}, returning last HTML response anyway.")
+            return html
+        self.stats["failures"] += 1
+        raise error
+
+    async def fetch_all(self, jobs, handle):
+        # `jobs` yields (job, link) pairs and is consumed lazily, keeping at
+        # most two pages per concurrency slot queued; `await handle(job, link,
+        # html_or_exception)` runs as each page completes. Returns the number
+        # of jobs.
+        async def one(job, link):
+            try:
+                result = await self.fetch(link)
+            except Exception as e:
+                result = e
+            await handle(job, link, result)
+
+        pending, count = set(), 0
+        try:
+            for job, link in jobs:
+                if len(pending) >= 2 * self.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+                pending.add(asyncio.create_task(one(job, link)))
+                count += 1
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+        finally:
+            # Cancelled or failed: stop the pages still in flight before the
+            # caller tears down whatever `handle` writes to.
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        return count
@@ -1,15 +1,27 @@
+import asyncio
 import csv
 import os
-import requests
-import time
-from queue import Queue
-from threading import Thread, Lock
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+from DataCollectionProccessing.collectionScripts.checkpoint import ScrapeJournal, pending_rows
+from DataCollectionProccessing.collectionScripts.fastExtract import UnsupportedPage, extractDataFast
+from DataCollectionProccessing.collectionScripts.fetchEngine import FetchEngine, PROXY_ENDPOINT
+from DataCollectionProccessing.collectionScripts.pageStore import PageStore
+from DataCollectionProccessing.collectionScripts.typedOutput import OUTPUT_HEADERS, append_format, output_row
+
 load_dotenv()
 apikey = os.getenv("proxy_api")
+# Point proxy_endpoint at stubServer.py to exercise the scraper offline.
+proxy_endpoint = os.getenv("proxy_endpoint", PROXY_ENDPOINT)
+num_workers = int(os.getenv("scrape_concurrency", "18"))
+parse_workers = int(os.getenv("parse_workers", "0")) or os.cpu_count()
+CSV_DIR = Path(__file__).resolve().parent.parent / "csvData"
+# Every fetched page is kept here for replayPages.py; set it empty to skip.
+page_store = os.getenv("page_store", str(CSV_DIR.parent / "pageStore"))
 
 
 def extractData(html, fragrance_name):
@@ -152,111 +164,71 @@ def extractData(html, fragrance_name):
     return output
 
 
-def fetch(link, api, max_retries=3, wait_between=2):
-    for attempt in range(1, max_retries + 1):
-        print(f"[fetch] Attempt {attempt} for URL: {link}")
-        payload = {
-            "api_key": api,
-            "url": link,
-            "render": "true",
-            "wait_seconds": "3",
-        }
-        r = requests.get("https://api.scraperapi.com", params=payload)
-        html = r.text
-
-        if 'itemprop="description"' in html:
-            print(f"[fetch] Successfully found 'itemprop=\"description\"' on attempt {attempt}")
-            return html
-        else:
-            print(f"[fetch] 'description' not found on attempt {attempt}, retrying in {wait_between}s...")
-            time.sleep(wait_between)
-
-    print("[fetch] Max retries reached, returning last HTML response anyway.")
-    return html
-
-
-def countRows(filename):
-    with open(filename, "r", encoding="utf-8") as f:
-        return sum(1 for _ in f) - 1
-
-
-def process_row(row, api):
-    link = row[2]
-    print(f"[process_row] Fetching link for fragrance: {row[0]}")
-    html = fetch(link, api)
-    return extractData(html, row[0])
-
-
-def worker(row_queue, writer, output_headers, lock, api):
-    while True:
-        item = row_queue.get()
-        if item is None:
-            row_queue.task_done()
-            break
-
-        idx, row = item
-        print(f"[worker] Starting row {idx} - {row[0]}")
+def parsePage(html, fragrance_name):
+    # extractDataFast handles well-formed pages; the rest go through
+    # extractData so their ERROR fields read exactly as before.
+    try:
+        return extractDataFast(html, fragrance_name)
+    except UnsupportedPage:
+        return extractData(html, fragrance_name)
+
+
+async def processCsvAsync(inputFiles, outputFile, api, concurrency=num_workers, endpoint=proxy_endpoint,
+                         workers=parse_workers, storeDir=page_store, **engine_options):
+    # Resumable: rows are appended to outputFile and every finished link is
+    # journaled next to it, so rerunning the same command after a crash or
+    # Ctrl-C fetches only the links that are still missing. Links that fail
+    # are journaled as errors and retried by the next run instead of landing
+    # in the output. A .jsonl outputFile gets typed records (typedOutput.py)
+    # instead of CSV rows.
+    if isinstance(inputFiles, (str, Path)):
+        inputFiles = [inputFiles]
+    fmt = append_format(outputFile)
+
+    loop = asyncio.get_running_loop()
+    pool = ProcessPoolExecutor(max_workers=workers)
+    store = PageStore(storeDir).open() if storeDir else None
+    with ScrapeJournal(outputFile, OUTPUT_HEADERS) as journal:
+        print(f"[processCsv] {len(journal.done)} links already done, {len(journal.failed)} failed last time.")
+
+        # Runs on the event loop, so rows are written without a lock. Pages
+        # are parsed in worker processes, so parsing neither holds the GIL
+        # against the fetchers nor is limited to one core.
+        async def handle(row, link, result):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                if store is not None:
+                    # gzip releases the GIL, so compressing off the loop is enough.
+                    store.record(link, await asyncio.to_thread(store.write_object, result))
+                extracted = await loop.run_in_executor(pool, parsePage, result, row[0])
+                journal.record(link, output_row(extracted, fmt))
+                print(f"[worker] Finished {row[0]} ({len(journal.done)} done)")
+            except Exception as e:
+                print(f"[worker] Error processing {row[0]}: {e}")
+                journal.fail(link, e)
+
+        print(f"[processCsv] Fetching pending rows, {concurrency} at a time, parsing on {workers} processes.")
         try:
-            result = process_row(row, api)
-            output_data = [result.get(h, "") for h in output_headers]
-            with lock:
-                writer.writerow(output_data)
-            print(f"[worker] Finished row {idx} - {row[0]}")
-        except Exception as e:
-            print(f"[worker] Error processing row {idx} - {row[0]}: {e}")
-            with lock:
-                writer.writerow([f"ERROR: {e}"] + row)
-
-        row_queue.task_done()
+            async with FetchEngine(api, endpoint=endpoint, concurrency=concurrency, **engine_options) as engine:
+                count = await engine.fetch_all(pending_rows(inputFiles, journal.done), handle)
+        finally:
+            pool.shutdown(cancel_futures=True)
+            if store is not None:
+                store.close()
+        print(f"[processCsv] Fetched {count} rows. Fetch stats: {engine.stats}")
+        if journal.failed:
+            print(f"[processCsv] {len(journal.failed)} links failed; rerun to retry them.")
 
+    print(f"[processCsv] Done. Output written to {outputFile}")
 
-def processCsv(inputFile, outputFile, api):
-    numRows = countRows(inputFile)
-    print(f"[processCsv] Found {numRows} data rows (excluding header).")
-
-    with open(inputFile, mode="r", encoding="utf-8") as infile:
-        reader = csv.reader(infile)
-        header = next(reader)
-        rows = list(reader)
-
-    outputHeaders = [
-        "name", "brand", "accords", "ratingValue",
-        "ratingCount", "seasons", "timeOfDay",
-        "gender", "priceValue", "notesBreakdown"
-    ]
-
-    out_file = open(outputFile, mode="w", newline="", encoding="utf-8")
-    writer = csv.writer(out_file)
-    writer.writerow(outputHeaders)
-
-    row_queue = Queue()
-    lock = Lock()
-    threads = []
-    num_workers = 18
-
-    for _ in range(num_workers):
-        t = Thread(target=worker, args=(row_queue, writer, outputHeaders, lock, api), daemon=True)
-        t.start()
-        threads.append(t)
-
-    for i, row in enumerate(rows):
-        row_queue.put((i, row))
-
-    print(f"[processCsv] Queued {len(rows)} rows with {num_workers} worker threads.")
-
-    for _ in range(num_workers):
-        row_queue.put(None)
-
-    row_queue.join()
-
-    for t in threads:
-        t.join()
 
-    out_file.close()
-    print(f"[processCsv] Done. Output written to {outputFile}")
+def processCsv(inputFiles, outputFile, api, **options):
+    asyncio.run(processCsvAsync(inputFiles, outputFile, api, **options))
 
 
 if __name__ == "__main__":
-    csv_filename = "extra_fragrance_list_brands.csv"
-    output_filename = "extra_raw_data.csv"
-    processCsv(csv_filename, output_filename, apikey)
+    # Both lists feed one output; a link listed in both is scraped once.
+    list_files = [CSV_DIR / "fragrance_list_brands.csv", CSV_DIR / "extra_fragrance_list_brands.csv"]
+    output_filename = CSV_DIR / "scraped_raw_data.csv"
+    processCsv(list_files, output_filename, apikey)
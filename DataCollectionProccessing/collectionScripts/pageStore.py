@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# Local store of every page the scraper fetched, so extraction can be rerun
+# without going back through the proxy. Pages are gzip files named by the
+# sha256 of their HTML (objects/ab/abcd....html.gz), so a page that did not
+# change between fetches is stored once. index.jsonl gets one line per fetch
+# with the URL, the fetch time and the page hash.
+
+
+class PageStore:
+    def __init__(self, root, compresslevel=6):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.indexFile = self.root / "index.jsonl"
+        self.compresslevel = compresslevel
+        self.index = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self):
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.index = open(self.indexFile, mode="a", encoding="utf-8")
+        return self
+
+    def close(self):
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+
+    def path(self, digest):
+        return self.objects / digest[:2] / f"{digest}.html.gz"
+
+    def write_object(self, html):
+        # Safe to call from threads and other processes: the object is
+        # written to a temporary file and renamed into place.
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=self.compresslevel, mtime=0))
+            os.replace(tmp, path)
+        return digest
+
+    def record(self, url, digest, fetched_at=None):
+        entry = {"url": url, "fetched_at": time.time() if fetched_at is None else fetched_at, "sha256": digest}
+        self.index.write(json.dumps(entry) + "\n")
+        self.index.flush()
+        return entry
+
+    def put(self, url, html, fetched_at=None):
+        return self.record(url, self.write_object(html), fetched_at)
+
+    def get(self, digest):
+        return gzip.decompress(self.path(digest).read_bytes()).decode("utf-8")
+
+    def entries(self):
+        # Index lines in fetch order; a line cut short by a crash is skipped.
+        if not self.indexFile.exists():
+            return
+        with open(self.indexFile, mode="r", encoding="utf-8") as f:
+            for line in f:
+                if line.endswith("\n"):
+                    yield json.loads(line)
+
+    def history(self, url):
+        return sorted((e for e in self.entries() if e["url"] == url), key=lambda e: e["fetched_at"])
+
+    def latest(self, as_of=None):
+        # url -> newest entry fetched at or before `as_of`, in the order the
+        # URLs were first fetched.
+        latest = {}
+        for entry in self.entries():
+            if as_of is not None and entry["fetched_at"] > as_of:
+                continue
+            current = latest.get(entry["url"])
+            if current is None or entry["fetched_at"] >= current["fetched_at"]:
+                latest[entry["url"]] = entry
+        return latest
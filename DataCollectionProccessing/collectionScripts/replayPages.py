@@ -0,0 +1,70 @@
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from DataCollectionProccessing.collectionScripts.multithreadedGatheringData import CSV_DIR, page_store, parsePage
+from DataCollectionProccessing.collectionScripts.pageStore import PageStore
+from DataCollectionProccessing.collectionScripts.typedOutput import (
+    OUTPUT_HEADERS, jsonl_line, output_format, output_row, write_parquet,
+)
+
+# Reruns extraction over the pages in the page store instead of the proxy,
+# e.g. after extractData gains a field. Workers read and decompress the
+# pages themselves, so only hashes and parsed rows cross process boundaries.
+
+
+def replayPage(job):
+    root, url, digest, fmt = job
+    try:
+        return output_row(parsePage(PageStore(root).get(digest), url), fmt)
+    except Exception as e:
+        print(f"[replay] Error processing {url}: {e}")
+        return None
+
+
+def replay(storeDir, outputFile, workers=None, as_of=None):
+    # Writes one row per URL from its newest stored page (fetched at or
+    # before `as_of`, if given), in the order the URLs were first fetched.
+    # The output suffix picks CSV, JSON Lines or Parquet.
+    fmt = output_format(outputFile)
+    latest = PageStore(storeDir).latest(as_of)
+    jobs = [(str(storeDir), url, entry["sha256"], fmt) for url, entry in latest.items()]
+    workers = workers or os.cpu_count()
+    print(f"[replay] Parsing {len(jobs)} stored pages on {workers} processes.")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        rows = pool.map(replayPage, jobs, chunksize=max(1, len(jobs) // (workers * 8)))
+        rows = [values for values in rows if values is not None]
+    failed = len(jobs) - len(rows)
+
+    if fmt == "parquet":
+        write_parquet(rows, outputFile)
+    else:
+        with open(outputFile, mode="w", newline="", encoding="utf-8") as out:
+            if fmt == "jsonl":
+                out.writelines(jsonl_line(values) for values in rows)
+            else:
+                writer = csv.writer(out)
+                writer.writerow(OUTPUT_HEADERS)
+                writer.writerows(rows)
+    print(f"[replay] Done in {time.perf_counter() - start:.1f}s, {failed} pages failed. Output written to {outputFile}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract fragrance rows from the local page store")
+    parser.add_argument("--store", default=page_store)
+    parser.add_argument("--output", default=str(CSV_DIR / "replayed_raw_data.csv"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--as-of", help="ISO timestamp; ignore pages fetched after it")
+    args = parser.parse_args()
+
+    as_of = datetime.fromisoformat(args.as_of).timestamp() if args.as_of else None
+    replay(args.store, args.output, args.workers, as_of)
+
+
+if __name__ == "__main__":
+    main()
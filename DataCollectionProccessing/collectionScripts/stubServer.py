@@ -0,0 +1,231 @@
+import argparse
+import html
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, unquote
+
+# Stands in for the proxy API when testing the scraper: answers
+# /?url=<page link> with a saved page from --pages (matched on the link's
+# file name) or with a synthetic page in Fragrantica's markup, and injects
+# latency, error statuses, hung requests, dropped connections and
+# unrendered pages at the configured rates.
+
+ACCORDS = ["woody", "citrus", "fresh", "amber", "floral", "rose", "sweet", "vanilla", "musky", "aromatic",
+           "warm spicy", "leather", "powdery", "green", "marine"]
+NOTES = ["Bergamot", "Lemon", "Pink Pepper", "Lavender", "Rose", "Jasmine", "Iris", "Cedar", "Vetiver",
+         "Patchouli", "Amber", "Vanilla", "Musk", "Tonka Bean", "Oud", "Leather"]
+GENDER_VOTES = ["female", "more female", "unisex", "more male", "male"]
+PRICE_VOTES = ["way overpriced", "overpriced", "ok", "good value", "great value"]
+
+
+def page_identity(link):
+    # /perfume/<Brand>/<Name-With-Dashes>-<id>.html
+    parts = urlparse(link).path.strip("/").split("/")
+    brand = unquote(parts[-2]).replace("-", " ") if len(parts) >= 2 else "Stub Brand"
+    name = unquote(parts[-1]).removesuffix(".html").rsplit("-", 1)[0].replace("-", " ") if parts else "Stub"
+    return name, brand
+
+
+def vote_block(label, votes):
+    rows = "".join(
+        f'<div class="grid-x"><div class="cell small-5 medium-5 large-5"><span>{html.escape(k)}</span></div>'
+        f'<div class="cell small-1 medium-1 large-1"><span>{v}</span></div></div>'
+        for k, v in votes.items()
+    )
+    return f'<div><div><span>{label}</span></div><div style="margin-top: 1.5rem;">{rows}</div></div>'
+
+
+def legend_block(label, width):
+    return (
+        f'<div class="cell"><div class="voting-small-chart-size"><div><div style="width: {width:.2f}%;"></div></div></div>'
+        f'<div><span class="vote-button-legend">{label}</span></div></div>'
+    )
+
+
+def notes_block(rng):
+    def notes(k):
+        return "".join(
+            f'<div><a href="#"><img src="n.jpg"></a>{html.escape(n)}</div>' for n in rng.sample(NOTES, k)
+        )
+    return (
+        '<div id="pyramid"><div class="cell"><div><div>'
+        f'<h4>Top Notes</h4><div>{notes(3)}</div>'
+        f'<h4>Middle Notes</h4><div>{notes(3)}</div>'
+        f'<h4>Base Notes</h4><div>{notes(3)}</div>'
+        '</div></div></div></div>'
+    )
+
+
+def synthetic_page(link, rendered=True):
+    # Same structure extractData walks on a real page, with values seeded by
+    # the link so every request for it returns the same page.
+    rng = random.Random(zlib.crc32(link.encode("utf-8")))
+    name, brand = page_identity(link)
+    accords = sorted(((a, rng.uniform(20, 100)) for a in rng.sample(ACCORDS, 5)), key=lambda x: -x[1])
+    accord_bars = "".join(
+        f'<div class="accord-bar" style="background: rgb(200, 120, 80); width: {w:.4f}%;">{a}</div>'
+        for a, w in accords
+    )
+    legends = "".join(legend_block(s, rng.uniform(0, 100)) for s in ["winter", "spring", "summer", "fall", "day", "night"])
+    body = (
+        f'<div itemprop="description"><p><b>{html.escape(name)}</b> by <b>{html.escape(brand)}</b> '
+        f'is a fragrance for testing.</p></div>' if rendered else "<div>Loading…</div>"
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>"
+        f"{html.escape(name)} {html.escape(brand)}</title></head><body>"
+        f"{body}<div class=\"accords\">{accord_bars}</div>"
+        f'<span itemprop="ratingValue">{rng.uniform(3, 4.8):.2f}</span>'
+        f'<span itemprop="ratingCount">{rng.randint(10, 25000):,}</span>'
+        f"<div class=\"grid-x\">{legends}</div>"
+        + vote_block("Gender", {k: rng.randint(0, 400) for k in GENDER_VOTES})
+        + vote_block("Price value", {k: rng.randint(0, 400) for k in PRICE_VOTES})
+        + notes_block(rng)
+        + "</body></html>"
+    )
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up on an injected hang or reset is expected.
+        pass
+
+
+class StubServer:
+    def __init__(self, host="127.0.0.1", port=0, pages=None, latency=0.0, jitter=0.0, failure_rate=0.0,
+                 hang_rate=0.0, hang_seconds=30.0, reset_rate=0.0, not_ready_rate=0.0, seed=0):
+        self.pages = Path(pages) if pages else None
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.reset_rate = reset_rate
+        self.not_ready_rate = not_ready_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"connections": 0, "requests": 0, "failures": 0, "hangs": 0, "resets": 0, "not_ready": 0}
+        self.server = QuietServer((host, port), self.handler_class())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def draw(self):
+        with self.lock:
+            return self.random.random(), self.random.uniform(-self.jitter, self.jitter)
+
+    def page(self, link, rendered):
+        if self.pages is not None and rendered:
+            saved = self.pages / Path(urlparse(link).path).name
+            if saved.is_file():
+                return saved.read_text(encoding="utf-8")
+        return synthetic_page(link, rendered)
+
+    def handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                stub.count("connections")
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub.count("requests")
+                query = parse_qs(urlparse(self.path).query)
+                if "url" not in query:
+                    return self.reply(400, "missing url")
+                roll, jitter = stub.draw()
+                time.sleep(max(0.0, stub.latency + jitter))
+
+                # One roll picks at most one injected fault per request.
+                faults = [("resets", stub.reset_rate), ("hangs", stub.hang_rate),
+                          ("failures", stub.failure_rate), ("not_ready", stub.not_ready_rate)]
+                fault = None
+                for key, rate in faults:
+                    if roll < rate:
+                        fault = key
+                        break
+                    roll -= rate
+                if fault:
+                    stub.count(fault)
+                if fault == "resets":
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+                if fault == "hangs":
+                    time.sleep(stub.hang_seconds)
+                if fault == "failures":
+                    return self.reply(503, "upstream unavailable")
+                self.reply(200, stub.page(query["url"][0], rendered=fault != "not_ready"))
+
+            def reply(self, status, text):
+                body = text.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the scraping proxy API")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--pages", help="directory of saved pages, named like the link's last path segment")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--failure-rate", type=float, default=0.05, help="share of 503 responses")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of requests that stall")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="share of dropped connections")
+    parser.add_argument("--not-ready-rate", type=float, default=0.05, help="share of unrendered pages")
+    args = parser.parse_args()
+
+    stub = StubServer(
+        port=args.port, pages=args.pages, latency=args.latency, jitter=args.jitter,
+        failure_rate=args.failure_rate, hang_rate=args.hang_rate, reset_rate=args.reset_rate,
+        not_ready_rate=args.not_ready_rate,
+    )
+    print(f"Stub proxy listening on {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        print(json.dumps(stub.stats))
+
+
+if __name__ == "__main__":
+    main()
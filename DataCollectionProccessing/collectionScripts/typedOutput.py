@@ -0,0 +1,128 @@
+import argparse
+import json
+from pathlib import Path
+
+# Typed form of an extractData result, for JSON Lines and Parquet output in
+# place of repr strings in CSV cells: vote and accord fields stay mappings,
+# notesBreakdown stays lists, ratingValue is a float and ratingCount an int.
+# A field extractData reported as "ERROR - ..." is null, and its message is
+# kept under "errors". The output format follows the output file suffix;
+# anything but .jsonl/.parquet is written as the old CSV.
+
+OUTPUT_HEADERS = [
+    "name", "brand", "accords", "ratingValue",
+    "ratingCount", "seasons", "timeOfDay",
+    "gender", "priceValue", "notesBreakdown"
+]
+MAP_FIELDS = {"accords": float, "seasons": float, "timeOfDay": float, "gender": int, "priceValue": int}
+NOTE_TIERS = ["topnotes", "midnotes", "bottomnotes"]
+
+
+def output_format(path):
+    suffix = Path(path).suffix.lower()
+    return suffix[1:] if suffix in (".jsonl", ".parquet") else "csv"
+
+
+def append_format(path):
+    # Scrapes append row by row, which Parquet cannot do.
+    fmt = output_format(path)
+    if fmt == "parquet":
+        raise ValueError("Parquet cannot be appended to; scrape to .jsonl and convert it with typedOutput.py")
+    return fmt
+
+
+def number(value, kind):
+    # Unparseable counts become null, as pd.to_numeric(errors="coerce") did.
+    try:
+        return kind(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def typed_record(extracted):
+    record, errors = {}, {}
+    for field in OUTPUT_HEADERS:
+        value = extracted.get(field)
+        if isinstance(value, str) and value.startswith("ERROR"):
+            errors[field] = value
+            value = None
+        elif field == "ratingValue":
+            value = number(value, float)
+        elif field == "ratingCount":
+            value = number(value, int)
+        elif field in MAP_FIELDS or field == "notesBreakdown":
+            if value is not None and not isinstance(value, dict):
+                errors[field] = f"ERROR - expected a mapping, got {value!r}"
+                value = None
+            elif field in MAP_FIELDS and value is not None:
+                value = {str(k): MAP_FIELDS[field](v) for k, v in value.items()}
+            elif value is not None:
+                value = {tier: list(value.get(tier, [])) for tier in NOTE_TIERS}
+        record[field] = value
+    record["errors"] = errors
+    return record
+
+
+def output_row(extracted, fmt):
+    if fmt == "csv":
+        return [extracted.get(h, "") for h in OUTPUT_HEADERS]
+    return typed_record(extracted)
+
+
+def jsonl_line(record):
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def arrow_schema():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from e
+    arrow_types = {float: pa.float64(), int: pa.int64(), str: pa.string()}
+    fields = []
+    for field in OUTPUT_HEADERS + ["errors"]:
+        if field in MAP_FIELDS:
+            kind = pa.map_(pa.string(), arrow_types[MAP_FIELDS[field]])
+        elif field == "errors":
+            kind = pa.map_(pa.string(), pa.string())
+        elif field == "notesBreakdown":
+            kind = pa.struct([pa.field(tier, pa.list_(pa.string())) for tier in NOTE_TIERS])
+        else:
+            kind = arrow_types[{"ratingValue": float, "ratingCount": int}.get(field, str)]
+        fields.append(pa.field(field, kind))
+    return pa.schema(fields)
+
+
+def write_parquet(records, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema()
+    # Arrow maps are built from (key, value) pairs.
+    rows = [
+        {k: list(v.items()) if isinstance(v, dict) and (k in MAP_FIELDS or k == "errors") else v
+         for k, v in record.items()}
+        for record in records
+    ]
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), path)
+
+
+def read_jsonl(path):
+    with open(path, mode="r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    # JSON Lines is what a resumable scrape appends to; Parquet has to be
+    # written in one go, so it is produced from the finished JSON Lines file.
+    parser = argparse.ArgumentParser(description="Convert a scraped .jsonl file to Parquet")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    args = parser.parse_args()
+    records = read_jsonl(args.input)
+    write_parquet(records, args.output)
+    print(f"Wrote {len(records)} records to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+import argparse
+import ast
+import filecmp
+import hashlib
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CSV_DIR = Path(__file__).resolve().parent.parent / "csvData"
+RAW_FILES = [CSV_DIR / "raw_data.csv", CSV_DIR / "extra_raw_data.csv"]
+OUTPUT_FILE = CSV_DIR / "fragrance_data.csv"
+MANIFEST_FILE = CSV_DIR / ".processing_manifest.json"
+MANIFEST_FORMAT = 1
+
+RATING_COUNT_QUANTILE = 0.10
+RATING_VALUE_QUANTILE = 0.15
+
+accord_groups = {
+    "Woody & Earthy": {"woody", "mossy", "patchouli", "earthy", "conifer"},
+    "Smoky & Leathery": {"smoky", "leather", "animalic", "tobacco"},
+    "Resinous & Balsamic": {"amber", "balsamic", "vanilla"},
+    "Citrus & Fresh": {"citrus", "fresh", "marine", "ozonic", "aquatic"},
+    "Green & Herbal": {"green", "herbal", "aromatic", "lavender"},
+    "Warm & Spicy": {"warm spicy", "cinnamon", "soft spicy"},
+    "Sweet & Gourmand": {"sweet", "honey", "caramel", "chocolate", "cacao", "coffee", "nutty", "almond"},
+    "Floral": {"floral", "white floral", "yellow floral", "rose", "violet", "tuberose", "iris"},
+    "Powdery & Soft": {"powdery", "musky", "soapy", "lactonic"},
+    "Synthetic": {"metallic", "aldehydic", "mineral", "vinyl", "alcohol"},
+    "Uncommon": {"cannabis", "coca-cola", "Champagne", "whiskey", "vodka", "savory", "sand", "beeswax", "bitter", "sour", "terpenic"},
+}
+
+gender_mapping = {
+    "female": -2, "more female": -1, "unisex": 0,
+    "more male": 1, "male": 2
+}
+
+price_mapping = {
+    "way overpriced": -2, "overpriced": -1, "ok": 0,
+    "good value": 1, "great value": 2
+}
+
+score_columns = ['gender_score', 'priceValue_score', 'timeOfDay_score', 'season_score']
+selected = ['name', 'brand', 'ratingValue', 'ratingCount'] + score_columns + list(accord_groups.keys()) + ['notesBreakdown']
+
+
+# Typed scraper output (collectionScripts/typedOutput.py) keeps these as
+# mappings; Parquet hands them back as (key, value) pairs.
+MAP_COLUMNS = ['accords', 'seasons', 'timeOfDay', 'gender', 'priceValue', 'errors']
+
+
+def read_raw(path):
+    # CSV cells hold repr strings that the stages below literal_eval; JSON
+    # Lines and Parquet rows arrive with native dicts, lists and numbers.
+    suffix = Path(path).suffix.lower()
+    if suffix == '.jsonl':
+        with open(path, encoding='utf-8') as f:
+            return pd.DataFrame.from_records([json.loads(line) for line in f if line.strip()])
+    if suffix == '.parquet':
+        import pyarrow.parquet as pq
+        records = pq.read_table(path).to_pylist()
+        for record in records:
+            for col in MAP_COLUMNS:
+                if record.get(col) is not None:
+                    record[col] = dict(record[col])
+        return pd.DataFrame.from_records(records)
+    return pd.read_csv(path)
+
+
+def load(paths=RAW_FILES):
+    return pd.concat([read_raw(path) for path in paths], ignore_index=True)
+
+
+def clean(df):
+    # Scraper failures are written as "ERROR - ..." into whichever field
+    # failed, so any cell mentioning "error" marks the row as unusable.
+    # Checked one column at a time instead of one row at a time.
+    text = df.astype(str)
+    has_error = np.zeros(len(df), dtype=bool)
+    for col in text.columns:
+        has_error |= text[col].str.contains('error', case=False, regex=False).to_numpy()
+    df = df[~(has_error & df.notna().any(axis=1).to_numpy())]
+    df = df[~df['accords'].map(lambda accords: accords in ('{}', {}))].copy()
+
+    for col in ['ratingCount', 'ratingValue']:
+        df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', '', regex=True), errors='coerce')
+    return df
+
+
+def cutoff(df, count_quantile=RATING_COUNT_QUANTILE, value_quantile=RATING_VALUE_QUANTILE):
+    # Drops the least-rated and worst-rated tail of the catalog.
+    rating_count_cutoff = df['ratingCount'].quantile(count_quantile)
+    rating_value_cutoff = df['ratingValue'].quantile(value_quantile)
+    return df[~((df['ratingCount'] <= rating_count_cutoff) | (df['ratingValue'] <= rating_value_cutoff))]
+
+
+def parse_accords(values):
+    return [ast.literal_eval(x) if isinstance(x, str) and x.startswith('{') else x for x in values]
+
+
+def document_counts(accord_dicts):
+    doc_counts = Counter()
+    for accords in accord_dicts:
+        doc_counts.update(accords.keys())
+    return doc_counts
+
+
+def accord_strengths(accord_dicts, doc_counts, total_fragrances):
+    # TF-IDF per accord, summed into the accord groups. Document frequencies
+    # come in precounted instead of being rescanned from the whole column for
+    # every accord of every row.
+    vocabulary = {accord: i for i, accord in enumerate(doc_counts)}
+    idf = {accord: np.log((total_fragrances + 1) / (count + 1)) for accord, count in doc_counts.items()}
+
+    tf = np.zeros((len(accord_dicts), len(vocabulary)))
+    for row, accords in enumerate(accord_dicts):
+        for accord, strength in accords.items():
+            tf[row, vocabulary[accord]] = strength
+
+    strengths = {}
+    for group, accords in accord_groups.items():
+        present = [accord for accord in accords if accord in vocabulary]
+        strength = np.zeros(len(accord_dicts))
+        for accord in present:
+            strength += tf[:, vocabulary[accord]] * idf[accord]
+        # A group no fragrance has stays an integer column of zeros, as it
+        # always was, so the CSV keeps writing "0" rather than "0.0".
+        strengths[group] = strength if present else 0
+    return strengths
+
+
+def group_accords(df):
+    accord_dicts = parse_accords(df['accords'])
+    return df.assign(accords=accord_dicts, **accord_strengths(accord_dicts, document_counts(accord_dicts), len(df)))
+
+
+def compute_weighted_score(vote_dict, mapping):
+    if isinstance(vote_dict, str):
+        vote_dict = ast.literal_eval(vote_dict)
+
+    total_votes = sum(vote_dict.values())
+    if total_votes == 0:
+        return 0
+
+    weighted_sum = sum(mapping[key] * count for key, count in vote_dict.items() if key in mapping)
+    return weighted_sum / total_votes
+
+
+def compute_time(tod_dict):
+    if isinstance(tod_dict, str):
+        tod_dict = ast.literal_eval(tod_dict)
+
+    return tod_dict.get('day', 0) - tod_dict.get('night', 0)
+
+
+def compute_season_score(votes):
+    if isinstance(votes, str):
+        votes = ast.literal_eval(votes)
+    return (votes.get('summer', 0) + votes.get('spring', 0)) - (votes.get('fall', 0) + votes.get('winter', 0))
+
+
+def vote_scores(row):
+    return [
+        compute_weighted_score(row.gender, gender_mapping),
+        compute_weighted_score(row.priceValue, price_mapping),
+        compute_time(row.timeOfDay),
+        compute_season_score(row.seasons),
+    ]
+
+
+def score_votes(df):
+    scores = [vote_scores(row) for row in df[['gender', 'priceValue', 'timeOfDay', 'seasons']].itertuples()]
+    return df.assign(**{col: [s[i] for s in scores] for i, col in enumerate(score_columns)})
+
+
+def export(df, path=OUTPUT_FILE):
+    newdf = df[selected].copy()
+    newdf.loc[:, list(accord_groups.keys())] = newdf.loc[:, list(accord_groups.keys())].round(5)
+    newdf.loc[:, score_columns] = newdf.loc[:, score_columns].round(5)
+    newdf = newdf.sort_values(by=["brand", "name"]).reset_index(drop=True)
+
+    # .jsonl and .parquet outputs carry notesBreakdown as a nested record
+    # rather than the repr string the CSV has always had.
+    suffix = Path(path).suffix.lower()
+    if suffix in ('.jsonl', '.parquet'):
+        notes = [ast.literal_eval(n) if isinstance(n, str) else n for n in newdf['notesBreakdown']]
+        # Counts come out of clean() as floats whenever any is missing.
+        typed = newdf.assign(notesBreakdown=notes, ratingCount=newdf['ratingCount'].astype('Int64'))
+        if suffix == '.jsonl':
+            typed.to_json(path, orient='records', lines=True, force_ascii=False)
+        else:
+            typed.to_parquet(path, index=False)
+    else:
+        newdf.to_csv(path, index=False)
+    return newdf
+
+
+def timed(timings, name, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    timings[name] = time.perf_counter() - start
+    return result
+
+
+def run(raw_files=RAW_FILES, output=OUTPUT_FILE):
+    # Returns the exported frame and the seconds spent in each stage.
+    timings = {}
+    df = timed(timings, "load", load, raw_files)
+    df = timed(timings, "clean", clean, df)
+    df = timed(timings, "cutoff", cutoff, df)
+    df = timed(timings, "accords", group_accords, df)
+    df = timed(timings, "votes", score_votes, df)
+    df = timed(timings, "export", export, df, output)
+    return df, timings
+
+
+def row_hashes(df):
+    # Content hash per raw row, independent of where the row sits in the files.
+    return pd.util.hash_pandas_object(df.astype(str), index=False).map(lambda h: format(h, "016x"))
+
+
+def file_digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest() if Path(path).exists() else None
+
+
+def read_manifest(path):
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("format") != MANIFEST_FORMAT or manifest.get("cutoff") != [RATING_COUNT_QUANTILE, RATING_VALUE_QUANTILE]:
+        return None
+    return manifest
+
+
+def run_incremental(raw_files=RAW_FILES, output=OUTPUT_FILE, manifest_path=MANIFEST_FILE):
+    # Same result as run(), but the per-row parsing (accords and votes, the
+    # bulk of the work) is reused from the manifest for every row whose
+    # content was seen before, and accord document frequencies are updated
+    # from the rows that entered or left the dataset instead of recounted.
+    # Loading, cleaning and the cutoff stay full passes: they are vectorized
+    # and the cutoff quantiles depend on every row. IDF changes with the row
+    # count, so the accord columns of every row are recomputed, which is
+    # cheap once the accords are parsed.
+    timings = {}
+    raw = timed(timings, "load", load, raw_files)
+    hashes = timed(timings, "hash", row_hashes, raw)
+    df = timed(timings, "clean", clean, raw)
+    df = timed(timings, "cutoff", cutoff, df)
+
+    manifest = timed(timings, "manifest", read_manifest, manifest_path) or {"rows": {}, "doc_counts": {}, "output": None}
+    previous = manifest["rows"]
+    keys = hashes.loc[df.index].tolist()
+    kept = Counter(keys)
+    before = Counter({key: row["n"] for key, row in previous.items()})
+    added, removed = kept - before, before - kept
+
+    def parse_new_rows():
+        rows = {key: previous[key] for key in kept if key in previous}
+        votes = df[['gender', 'priceValue', 'timeOfDay', 'seasons']]
+        for key, accords, row in zip(keys, df['accords'], votes.itertuples()):
+            if key not in rows:
+                rows[key] = {"accords": parse_accords([accords])[0], "scores": vote_scores(row)}
+        return rows
+
+    def update_document_counts():
+        doc_counts = Counter(manifest["doc_counts"])
+        for key, n in added.items():
+            for accord in rows[key]["accords"]:
+                doc_counts[accord] += n
+        for key, n in removed.items():
+            for accord in previous[key]["accords"]:
+                doc_counts[accord] -= n
+        return +doc_counts
+
+    rows = timed(timings, "parse", parse_new_rows)
+    doc_counts = timed(timings, "idf", update_document_counts)
+    changes = {"added": sum(added.values()), "removed": sum(removed.values()), "reused": len(keys) - sum(added.values())}
+
+    if not added and not removed and manifest["output"] == file_digest(output):
+        return df, timings, changes
+
+    def apply_rows():
+        accord_dicts = [rows[key]["accords"] for key in keys]
+        scores = [rows[key]["scores"] for key in keys]
+        return df.assign(
+            **accord_strengths(accord_dicts, doc_counts, len(df)),
+            **{col: [s[i] for s in scores] for i, col in enumerate(score_columns)},
+        )
+
+    scored = timed(timings, "accords", apply_rows)
+    df = timed(timings, "export", export, scored, output)
+
+    for key, row in rows.items():
+        row["n"] = kept[key]
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "cutoff": [RATING_COUNT_QUANTILE, RATING_VALUE_QUANTILE],
+        "total": len(keys),
+        "doc_counts": doc_counts,
+        "output": file_digest(output),
+        "rows": rows,
+    }
+    timed(timings, "save", lambda: Path(manifest_path).write_text(json.dumps(manifest), encoding="utf-8"))
+    return df, timings, changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn scraped raw data into fragrance_data.csv")
+    parser.add_argument("--raw", nargs="+", default=[str(p) for p in RAW_FILES],
+                        help="raw scraper output (.csv, .jsonl or .parquet), in order")
+    parser.add_argument("--output", default=str(OUTPUT_FILE), help=".csv, or .jsonl/.parquet for typed output")
+    parser.add_argument("--check", help="fail unless the output is byte-identical to this file")
+    parser.add_argument("--incremental", action="store_true", help="only reprocess rows that changed since the last run")
+    parser.add_argument("--manifest", default=str(MANIFEST_FILE), help="state kept between incremental runs")
+    args = parser.parse_args()
+
+    raw_files = [Path(p) for p in args.raw]
+    if args.incremental:
+        df, timings, changes = run_incremental(raw_files, Path(args.output), Path(args.manifest))
+        print(f"{changes['added']} rows added, {changes['removed']} removed, {changes['reused']} reused")
+    else:
+        df, timings = run(raw_files, Path(args.output))
+    for name, seconds in timings.items():
+        print(f"{name:<8} {seconds * 1000:>9.1f} ms")
+    print(f"{'total':<8} {sum(timings.values()) * 1000:>9.1f} ms  ({len(df)} fragrances -> {args.output})")
+
+    if args.check:
+        if not filecmp.cmp(args.output, args.check, shallow=False):
+            raise SystemExit(f"{args.output} differs from {args.check}")
+        print(f"Output is identical to {args.check}")
+
+
+if __name__ == "__main__":
+    main()
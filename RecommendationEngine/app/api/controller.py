@@ -1,33 +1,76 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from typing import List
 
 from app.config import ACCORD_COLS
-from app.model.schemas import RecommendationRequest, RecommendationResponse, AccordBasedRecommendationRequest
-from app.service.recommender import FragranceRecommender
-from fastapi_limiter.depends import RateLimiter
+from app.api.metrics import render_metrics
+from app.api.rate_limit import rate_limit
+from app.api.static_responses import PrecomputedJSONResponse
+from app.model.schemas import (
+    RecommendationRequest, RecommendationResponse, AccordBasedRecommendationRequest,
+    BatchRecommendationRequest, BatchRecommendationResult,
+)
+from app.service.cache import RecommendationCache
+from app.service.executor import RecommendationExecutor, RecommenderBusy
+from app.service.snapshot import DatasetSnapshot, SnapshotManager
 
 router = APIRouter()
-recommender = FragranceRecommender()
-sorted_fragrances = sorted(list(recommender.valid_names_brands))
 sorted_accords = sorted(ACCORD_COLS)
 
 
-@router.get("/", dependencies=[Depends(RateLimiter(times=5, seconds=60))])
+class ServingSnapshot(DatasetSnapshot):
+    # The list responses are derived from the data, so they live on the
+    # snapshot and swap together with it.
+    def __init__(self, recommender):
+        super().__init__(recommender)
+        self.fragrances_response = PrecomputedJSONResponse(
+            {"fragrances": recommender.name_index.entries}, self.version
+        )
+        self.accords_response = PrecomputedJSONResponse({"accords": sorted_accords}, self.version)
+
+
+snapshots = SnapshotManager(ServingSnapshot.load)
+result_cache = RecommendationCache()
+result_cache.bind_version(snapshots.current.version)
+executor = RecommendationExecutor(snapshots.current.recommender)
+
+
+@snapshots.on_swap
+def use_snapshot(snapshot):
+    result_cache.bind_version(snapshot.version)
+    executor.recommender = snapshot.recommender
+
+
+def busy_error(e):
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+@router.get("/", dependencies=[rate_limit(5, seconds=60)])
 async def root():
     return {"message": "Fragrance Recommendation API"}
 
 
-@router.get("/fragrances", dependencies=[Depends(RateLimiter(times=5, seconds=60))])
-async def list_fragrances():
-    return {"fragrances": sorted_fragrances}
+@router.get("/fragrances", dependencies=[rate_limit(5, seconds=60)])
+async def list_fragrances(request: Request):
+    return snapshots.current.fragrances_response.respond(request)
+
+@router.get("/fragrances/search", dependencies=[rate_limit(60, seconds=60)])
+async def search_fragrances(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+    fuzzy: bool = Query(default=False),
+):
+    return {"fragrances": snapshots.current.recommender.name_index.search(q, limit=limit, fuzzy=fuzzy)}
 
-@router.get("/accords", dependencies=[Depends(RateLimiter(times=5, seconds=60))])
-async def list_fragrances_accord():
-    return {"accords": sorted_accords}
+@router.get("/accords", dependencies=[rate_limit(5, seconds=60)])
+async def list_fragrances_accord(request: Request):
+    return snapshots.current.accords_response.respond(request)
 
 
-@router.post("/recommend-by-fragrances", response_model=List[RecommendationResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post("/recommend-by-fragrances", response_model=List[RecommendationResponse], dependencies=[rate_limit(10, seconds=60)])
 async def recommend_fragrances(request: RecommendationRequest):
+    snapshot = snapshots.current
+    recommender = snapshot.recommender
     try:
         invalid_names = [name for name in request.liked_fragrances
                          if name not in recommender.valid_names]
@@ -37,17 +80,27 @@ async def recommend_fragrances(request: RecommendationRequest):
                 detail=f"Invalid fragrance names: {', '.join(invalid_names)}"
             )
 
-        user_vector = recommender.build_user_profile(request.liked_fragrances)
-        recommendations = recommender.get_recommendations(
-            user_vector,
+        cache_key = result_cache.fragrance_key(request, snapshot.version)
+        cached = await result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        recommendations = await executor.run_on(
+            recommender,
+            "get_recommendations_by_names",
+            request.liked_fragrances,
             request.time_pref,
             request.season_pref,
             request.top_k,
-            request.diversity_factor
+            request.diversity_factor,
+            request.filters,
         )
 
+        await result_cache.set(cache_key, recommendations)
         return recommendations
 
+    except RecommenderBusy as e:
+        raise busy_error(e)
     except Exception as e:
         print(e)
         raise HTTPException(
@@ -55,8 +108,9 @@ async def recommend_fragrances(request: RecommendationRequest):
             detail=f"An error occurred while processing your request: {str(e)}"
         )
 
-@router.post("/recommend-by-accords", response_model=List[RecommendationResponse], dependencies=[Depends(RateLimiter(times=10, seconds=60))])
+@router.post("/recommend-by-accords", response_model=List[RecommendationResponse], dependencies=[rate_limit(10, seconds=60)])
 async def recommend_fragrances_by_accords(request: AccordBasedRecommendationRequest):
+    snapshot = snapshots.current
     try:
         invalid_accords = set(request.accord_preferences.keys()) - set(ACCORD_COLS)
         if invalid_accords:
@@ -75,18 +129,91 @@ async def recommend_fragrances_by_accords(request: AccordBasedRecommendationRequ
                 detail=f"Invalid weights for accords: {', '.join(invalid_weights)}. Weights must be between 0 and 1."
             )
 
-        recommendations = recommender.get_recommendations_by_accords(
+        cache_key = result_cache.accord_key(request, snapshot.version)
+        cached = await result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        recommendations = await executor.run_on(
+            snapshot.recommender,
+            "get_recommendations_by_accords",
             accord_preferences=request.accord_preferences,
             time_pref=request.time_pref,
             season_pref=request.season_pref,
             top_k=request.top_k,
-            diversity_factor=request.diversity_factor
+            diversity_factor=request.diversity_factor,
+            filters=request.filters,
         )
 
+        await result_cache.set(cache_key, recommendations)
         return recommendations
 
+    except RecommenderBusy as e:
+        raise busy_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred while processing your request: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/recommend-batch", response_model=List[BatchRecommendationResult], dependencies=[rate_limit(5, seconds=60)])
+async def recommend_batch(request: BatchRecommendationRequest):
+    recommender = snapshots.current.recommender
+    try:
+        invalid_names = sorted({
+            name for profile in request.profiles for name in profile.liked_fragrances
+            if name not in recommender.valid_names
+        })
+        if invalid_names:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid fragrance names: {', '.join(invalid_names)}"
+            )
+
+        profiles = request.profiles
+        batch_args = dict(
+            liked_fragrances=[p.liked_fragrances for p in profiles],
+            time_prefs=[p.time_pref for p in profiles],
+            season_prefs=[p.season_pref for p in profiles],
+            top_ks=[p.top_k for p in profiles],
+            diversity_factors=[p.diversity_factor for p in profiles],
+            filters=[p.filters for p in profiles],
+        )
+
+        if request.stream:
+            # Admitted like any other call: a full executor answers 503
+            # before the stream starts.
+            batch = executor.stream_on(recommender, "iter_batch_recommendations_by_names", **batch_args)
+
+            async def ndjson_lines():
+                index = 0
+                async for recommendations in batch:
+                    result = BatchRecommendationResult(index=index, recommendations=recommendations)
+                    yield result.model_dump_json() + "\n"
+                    index += 1
+
+            return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+        batch = await executor.run_on(recommender, "get_batch_recommendations_by_names", **batch_args)
+        return [
+            BatchRecommendationResult(index=index, recommendations=recommendations)
+            for index, recommendations in enumerate(batch)
+        ]
+
+    except RecommenderBusy as e:
+        raise busy_error(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while processing your request: {str(e)}"
+        )
+
+
+@router.get("/dataset", dependencies=[rate_limit(30, seconds=60)])
+async def dataset():
+    return snapshots.info()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[rate_limit(30, seconds=60)])
+async def metrics():
+    return PlainTextResponse(render_metrics(result_cache, executor), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,115 @@
+import bisect
+import threading
+import time
+
+from app.service.timing import start_timings, stop_timings
+
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    # Minimal Prometheus histogram (cumulative le buckets, _sum, _count) keyed
+    # by a tuple of label values.
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, seconds):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, seconds)] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, ([*counts], total, count)) for labels, (counts, total, count) in self._series.items())
+        for labels, (counts, total, count) in series:
+            label_text = ",".join(f'{k}="{v}"' for k, v in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, n in zip([*self.buckets, "+Inf"], counts):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Time from request start to response start.", ("method", "route", "status")
+)
+stage_duration = Histogram(
+    "request_stage_duration_seconds", "Time spent per request stage.", ("route", "stage")
+)
+
+
+def render_metrics(cache=None, executor=None):
+    lines = request_duration.render() + stage_duration.render()
+    if executor is not None:
+        stats = executor.stats()
+        lines += [
+            "# TYPE recommender_in_flight gauge", f"recommender_in_flight {stats['in_flight']}",
+            "# TYPE recommender_rejected_total counter", f"recommender_rejected_total {stats['rejected']}",
+        ]
+    if cache is not None:
+        stats = cache.stats()
+        for key in ("hits", "redis_hits", "misses", "redis_errors"):
+            name = f"recommendation_cache_{key}_total"
+            lines += [f"# TYPE {name} counter", f"{name} {stats.get(key, 0)}"]
+        lines += ["# TYPE recommendation_cache_entries gauge", f"recommendation_cache_entries {stats.get('entries', 0)}"]
+    return "\n".join(lines) + "\n"
+
+
+def server_timing(durations, total_ms):
+    # Stages do not overlap, so whatever they do not account for is routing,
+    # request parsing and response validation/serialization.
+    parts = [f"{name};dur={ms:.3f}" for name, ms in durations.items()]
+    parts.append(f"framework;dur={max(total_ms - sum(durations.values()), 0.0):.3f}")
+    parts.append(f"total;dur={total_ms:.3f}")
+    return ", ".join(parts)
+
+
+class TimingMiddleware:
+    # Pure ASGI middleware: collects the request's stage timings, adds them as
+    # a Server-Timing header and feeds the histograms. Only installed when
+    # TIMING_ENABLED is set, so the disabled path has no per-request cost.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings, token = start_timings()
+        start = time.perf_counter()
+        status = 500
+        total_ms = None
+
+        async def send_with_timing(message):
+            nonlocal status, total_ms
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - start) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timings.durations, total_ms).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_timings(token)
+            if total_ms is None:
+                total_ms = (time.perf_counter() - start) * 1000
+            route = getattr(scope.get("route"), "path", "unmatched")
+            request_duration.observe((scope["method"], route, str(status)), total_ms / 1000)
+            for stage, ms in timings.durations.items():
+                stage_duration.observe((route, stage), ms / 1000)
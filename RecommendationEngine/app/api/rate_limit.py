@@ -0,0 +1,191 @@
+import math
+import time
+
+import redis as pyredis
+from fastapi import Depends, HTTPException, Request
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS
+
+from app.config import RATE_LIMIT_SCALE, RATE_LIMIT_LOCAL_SYNC_MS
+from app.service.timing import current_timings
+
+
+# Fixed-window counters, one key per applicable limit, checked in order in a
+# single round trip. Per key this is the same logic fastapi-limiter used: the
+# first hit starts the window, a hit that would exceed the limit returns the
+# window's remaining milliseconds and later keys are left untouched.
+# ARGV holds (limit, window_ms, pending) per key; `pending` are hits the
+# process already admitted locally and only reports now. Returns
+# {pexpire, count_1, pttl_1, count_2, pttl_2, ...}.
+LUA_SCRIPT = """
+local result = {0}
+local rejected = false
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[3 * i - 2])
+    local window = ARGV[3 * i - 1]
+    local pending = tonumber(ARGV[3 * i])
+    local current = tonumber(redis.call('GET', key) or '0')
+    if current > 0 and pending > 0 then
+        current = redis.call('INCRBY', key, pending)
+    end
+    if not rejected then
+        if current > 0 then
+            if current + 1 > limit then
+                result[1] = redis.call('PTTL', key)
+                rejected = true
+            else
+                current = redis.call('INCR', key)
+            end
+        else
+            redis.call('SET', key, 1, 'PX', window)
+            current = 1
+        end
+    end
+    result[2 * i] = current
+    result[2 * i + 1] = redis.call('PTTL', key)
+end
+return result
+"""
+
+
+class Limit:
+    def __init__(self, times, seconds):
+        self.times = max(1, int(times * RATE_LIMIT_SCALE))
+        self.milliseconds = int(seconds * 1000)
+
+
+class LocalWindow:
+    # Last Redis view of one client's counters plus hits admitted since.
+    __slots__ = ("counts", "reset_at", "synced_at", "pending")
+
+    def __init__(self, counts, reset_at, synced_at):
+        self.counts = counts
+        self.reset_at = reset_at
+        self.synced_at = synced_at
+        self.pending = 0
+
+
+def client_identifier(request):
+    forwarded = request.headers.get("X-Forwarded-For")
+    ip = forwarded.split(",")[0] if forwarded else request.client.host
+    return ip + ":" + request.scope["path"]
+
+
+def too_many_requests(pexpire):
+    raise HTTPException(
+        HTTP_429_TOO_MANY_REQUESTS, "Too Many Requests", headers={"Retry-After": str(math.ceil(pexpire / 1000))}
+    )
+
+
+class RateLimiter:
+    # Evaluates the global limits and the route's own limit in one EVALSHA.
+    # With local_sync_ms > 0 each process also keeps a local copy of the
+    # counters and admits or rejects on it, only going to Redis once the copy
+    # is older than local_sync_ms (reporting the hits it admitted meanwhile)
+    # or a window ends. That trades a little accuracy across instances for
+    # far fewer round trips.
+    def __init__(self, prefix="rate-limit", local_sync_ms=RATE_LIMIT_LOCAL_SYNC_MS, clock=time.monotonic,
+                 max_local_entries=10000):
+        self.prefix = prefix
+        self.local_sync_ms = local_sync_ms
+        self.clock = clock
+        self.max_local_entries = max_local_entries
+        self.global_limits = []
+        self.redis = None
+        self._sha = None
+        self._local = {}
+
+    async def init(self, redis_client):
+        self.redis = redis_client
+        self._sha = await redis_client.script_load(LUA_SCRIPT)
+
+    async def close(self):
+        self.redis = None
+        self._local.clear()
+
+    def add_global_limit(self, times, seconds=60):
+        self.global_limits.append(Limit(times, seconds))
+
+    def limit(self, times, seconds=60):
+        route_limit = Limit(times, seconds)
+
+        async def check(request: Request):
+            timings = current_timings()
+            if not timings:
+                return await self.check(request, route_limit)
+            start = time.perf_counter()
+            try:
+                return await self.check(request, route_limit)
+            finally:
+                timings.add("rate_limit", (time.perf_counter() - start) * 1000)
+
+        return Depends(check)
+
+    async def check(self, request, route_limit):
+        if self.redis is None:
+            raise RuntimeError("RateLimiter.init must run in the app lifespan")
+        identifier = client_identifier(request)
+        limits = [*self.global_limits, route_limit]
+        if self.local_sync_ms > 0:
+            pexpire = self._check_local(identifier, limits)
+            if pexpire is not None:
+                if pexpire:
+                    too_many_requests(pexpire)
+                return
+        keys = [f"{self.prefix}:{identifier}:g{i}" for i in range(len(self.global_limits))]
+        keys.append(f"{self.prefix}:{identifier}:route")
+        pexpire = await self._sync(identifier, keys, limits)
+        if pexpire != 0:
+            too_many_requests(pexpire)
+
+    def _check_local(self, identifier, limits):
+        # Returns 0 to admit, the remaining window in ms to reject, or None
+        # when the local copy is missing or stale and Redis must decide.
+        window = self._local.get(identifier)
+        now = self.clock()
+        if window is None or (now - window.synced_at) * 1000 >= self.local_sync_ms:
+            return None
+        if any(now >= reset_at for reset_at in window.reset_at):
+            return None
+        for limit, count, reset_at in zip(limits, window.counts, window.reset_at):
+            if count + window.pending + 1 > limit.times:
+                return max(1, int((reset_at - now) * 1000))
+        window.pending += 1
+        return 0
+
+    async def _sync(self, identifier, keys, limits):
+        now = self.clock()
+        window = self._local.get(identifier) if self.local_sync_ms > 0 else None
+        args = []
+        for i, limit in enumerate(limits):
+            pending = window.pending if window is not None and now < window.reset_at[i] else 0
+            args += [limit.times, limit.milliseconds, pending]
+        try:
+            result = await self.redis.evalsha(self._sha, len(keys), *keys, *args)
+        except pyredis.exceptions.NoScriptError:
+            self._sha = await self.redis.script_load(LUA_SCRIPT)
+            result = await self.redis.evalsha(self._sha, len(keys), *keys, *args)
+
+        if self.local_sync_ms > 0:
+            now = self.clock()
+            counts = [int(c) for c in result[1::2]]
+            reset_at = [now + max(int(pttl), 0) / 1000 for pttl in result[2::2]]
+            if len(self._local) >= self.max_local_entries and identifier not in self._local:
+                self._prune(now)
+            self._local[identifier] = LocalWindow(counts, reset_at, now)
+        return int(result[0])
+
+    def _prune(self, now):
+        expired = [k for k, w in self._local.items() if all(now >= r for r in w.reset_at)]
+        for key in expired:
+            del self._local[key]
+        if len(self._local) >= self.max_local_entries:
+            self._local.clear()
+
+
+limiter = RateLimiter()
+
+
+def rate_limit(times, seconds=60):
+    # Limits are written at production values; RATE_LIMIT_SCALE raises them
+    # uniformly for load tests without touching individual routes.
+    return limiter.limit(times, seconds)
@@ -0,0 +1,76 @@
+import gzip
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+from app.config import STATIC_RESPONSE_MAX_AGE
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def parse_accept_encoding(header):
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+class PrecomputedJSONResponse:
+    # Serializes a payload that only changes with the dataset once, keeps
+    # identity/gzip/brotli encodings of it, and answers conditional requests
+    # with 304 so repeat clients skip the download entirely.
+    def __init__(self, payload, version, max_age=STATIC_RESPONSE_MAX_AGE):
+        body = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        self.etag_base = f"{version}-{digest}"
+        self.cache_control = f"public, max-age={max_age}, must-revalidate"
+        self.variants = {None: body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body, quality=11)
+
+    def etag(self, encoding):
+        return f'"{self.etag_base}-{encoding}"' if encoding else f'"{self.etag_base}"'
+
+    def matches(self, if_none_match):
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip().removeprefix("W/").strip('"')
+            if tag == self.etag_base or tag.startswith(self.etag_base + "-"):
+                return True
+        return False
+
+    def choose_encoding(self, accept_encoding):
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accepted.get(encoding, accepted.get("*", 0)) > 0:
+                return encoding
+        return None
+
+    def respond(self, request: Request):
+        encoding = self.choose_encoding(request.headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": self.etag(encoding),
+            "Cache-Control": self.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and self.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding], media_type="application/json", headers=headers)
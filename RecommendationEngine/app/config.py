@@ -1,7 +1,11 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_FILE = BASE_DIR / "data" / "fragrances.csv"
+NEIGHBOUR_TABLE_FILE = BASE_DIR / "data" / "neighbours.npz"
+CATALOG_DIR = Path(os.getenv("CATALOG_DIR", BASE_DIR / "data" / "catalog"))
+NEIGHBOUR_TABLE_SIZE = 20
 
 NUMERIC_FEATURE_COLS = [
     "Woody & Earthy", "Smoky & Leathery", "Resinous & Balsamic",
@@ -16,4 +20,39 @@ ACCORD_COLS = [
     "Citrus & Fresh", "Green & Herbal", "Warm & Spicy",
     "Sweet & Gourmand", "Floral", "Powdery & Soft", "Synthetic",
     "Uncommon"
-]
\ No newline at end of file
+]
+
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "2048"))
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600"))
+RESULT_CACHE_ACCORD_PRECISION = float(os.getenv("RESULT_CACHE_ACCORD_PRECISION", "0.01"))
+RESULT_CACHE_REDIS = os.getenv("RESULT_CACHE_REDIS", "false").lower() in {"1", "true", "yes"}
+
+STATIC_RESPONSE_MAX_AGE = int(os.getenv("STATIC_RESPONSE_MAX_AGE", "3600"))
+
+# "exact" scans every row, "ivf" probes an inverted-file index, "auto" picks
+# ivf once the catalog has at least ANN_MIN_ROWS rows.
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "auto")
+ANN_MIN_ROWS = int(os.getenv("ANN_MIN_ROWS", "50000"))
+IVF_N_LISTS = int(os.getenv("IVF_N_LISTS", "0"))
+IVF_N_PROBE = int(os.getenv("IVF_N_PROBE", "16"))
+IVF_TRAIN_ITERATIONS = int(os.getenv("IVF_TRAIN_ITERATIONS", "10"))
+IVF_PRIOR_CANDIDATES = int(os.getenv("IVF_PRIOR_CANDIDATES", "512"))
+
+RATE_LIMIT_SCALE = float(os.getenv("RATE_LIMIT_SCALE", "1"))
+# 0 = every request is checked against Redis; > 0 = admit/reject on a local
+# copy of the counters and sync with Redis at most this often.
+RATE_LIMIT_LOCAL_SYNC_MS = int(os.getenv("RATE_LIMIT_LOCAL_SYNC_MS", "0"))
+
+# Per-stage request timing (Server-Timing header + /metrics histograms).
+TIMING_ENABLED = os.getenv("TIMING_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+# Where recommendation work runs: "thread", "process" or "inline" (on the
+# event loop). 0 workers = one per CPU; 0 max in flight = max(32, 8 per worker).
+RECOMMENDER_EXECUTOR = os.getenv("RECOMMENDER_EXECUTOR", "thread")
+RECOMMENDER_WORKERS = int(os.getenv("RECOMMENDER_WORKERS", "0"))
+RECOMMENDER_MAX_IN_FLIGHT = int(os.getenv("RECOMMENDER_MAX_IN_FLIGHT", "0"))
+
+# A CSV file, catalog artifact directory or drop directory of CSVs to poll
+# for a new dataset; empty disables hot reload.
+DATASET_WATCH_PATH = os.getenv("DATASET_WATCH_PATH", "")
+DATASET_WATCH_INTERVAL = float(os.getenv("DATASET_WATCH_INTERVAL", "30"))
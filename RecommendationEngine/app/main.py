@@ -1,12 +1,14 @@
 from mangum import Mangum
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi_limiter import FastAPILimiter
-from fastapi_limiter.depends import RateLimiter
 import redis.asyncio as redis
 from contextlib import asynccontextmanager
+import asyncio
 import os
 
+from app.config import RESULT_CACHE_REDIS, TIMING_ENABLED, DATASET_WATCH_PATH, DATASET_WATCH_INTERVAL
+from app.api.metrics import TimingMiddleware
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -17,12 +19,23 @@ async def lifespan(app: FastAPI):
         encoding="utf-8",
         decode_responses=True,
     )
-    await FastAPILimiter.init(redis_client)
+    await limiter.init(redis_client)
     print("Redis rate-limiter INITIALISED")
+    if RESULT_CACHE_REDIS:
+        result_cache.redis = redis_client
+        print("Redis result cache ENABLED")
+    watcher = None
+    if DATASET_WATCH_PATH:
+        watcher = asyncio.create_task(snapshots.watch(DATASET_WATCH_PATH, DATASET_WATCH_INTERVAL))
+        print(f"Watching {DATASET_WATCH_PATH} for dataset updates")
     try:
         yield
     finally:
-        await FastAPILimiter.close()
+        if watcher is not None:
+            watcher.cancel()
+        result_cache.redis = None
+        executor.shutdown()
+        await limiter.close()
         await redis_client.aclose()
         print("Redis connection CLOSED")
 
@@ -42,11 +55,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
-from app.api.controller import router
+if TIMING_ENABLED:
+    app.add_middleware(TimingMiddleware)
+
+from app.api.controller import router, result_cache, executor, snapshots
+from app.api.rate_limit import limiter
 
-router.dependencies.append(Depends(RateLimiter(times=100, seconds=60)))
+limiter.add_global_limit(100, seconds=60)
 app.include_router(router)
 
 if __name__ == "__main__":
@@ -12,12 +12,35 @@ class SeasonPreference(str, Enum):
     cold = "cold"
     both = "both"
 
+class GenderLabel(str, Enum):
+    very_feminine = "Very Feminine"
+    feminine = "Feminine"
+    unisex = "Unisex"
+    masculine = "Masculine"
+    very_masculine = "Very Masculine"
+
+class PriceValueLabel(str, Enum):
+    very_overpriced = "Very Overpriced"
+    overpriced = "Overpriced"
+    fair_price = "Fair Price"
+    good_value = "Good Value"
+    excellent_value = "Excellent Value"
+
+class RecommendationFilters(BaseModel):
+    genders: Optional[List[GenderLabel]] = Field(default=None, min_length=1)
+    price_values: Optional[List[PriceValueLabel]] = Field(default=None, min_length=1)
+    include_brands: Optional[List[str]] = Field(default=None, min_length=1, max_length=100)
+    exclude_brands: Optional[List[str]] = Field(default=None, min_length=1, max_length=100)
+    min_rating: Optional[float] = Field(default=None, ge=0.0, le=5.0)
+    min_rating_count: Optional[int] = Field(default=None, ge=0)
+
 class RecommendationRequest(BaseModel):
     liked_fragrances: List[str] = Field(..., min_length=1, max_length=10)
     time_pref: TimePreference = Field(default=TimePreference.both)
     season_pref: SeasonPreference = Field(default=SeasonPreference.both)
     diversity_factor: float = Field(default=0.0, ge=0.0, le=1.0)
     top_k: int = Field(default=5, ge=1, le=20)
+    filters: Optional[RecommendationFilters] = Field(default=None)
 
 class AccordBasedRecommendationRequest(BaseModel):
     accord_preferences: dict[str, float] = Field(..., min_length=1)
@@ -25,6 +48,11 @@ class AccordBasedRecommendationRequest(BaseModel):
     season_pref: SeasonPreference = Field(default=SeasonPreference.both)
     diversity_factor: float = Field(default=0.0, ge=0.0, le=1.0)
     top_k: int = Field(default=5, ge=1, le=20)
+    filters: Optional[RecommendationFilters] = Field(default=None)
+
+class BatchRecommendationRequest(BaseModel):
+    profiles: List[RecommendationRequest] = Field(..., min_length=1, max_length=500)
+    stream: bool = Field(default=False)
 
 class RecommendationResponse(BaseModel):
     name: str
@@ -35,4 +63,8 @@ class RecommendationResponse(BaseModel):
     price_value_label: str
     match_score: float
     dominant_accords: List[Tuple[str, float]]
-    notes_breakdown: Optional[str]
\ No newline at end of file
+    notes_breakdown: Optional[str]
+
+class BatchRecommendationResult(BaseModel):
+    index: int
+    recommendations: List[RecommendationResponse]
\ No newline at end of file
@@ -0,0 +1,22 @@
+import argparse
+import time
+from pathlib import Path
+
+from app.config import DATA_FILE, CATALOG_DIR
+from app.service.catalog import Catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert fragrances.csv into the binary catalog artifact")
+    parser.add_argument("--source", default=str(DATA_FILE))
+    parser.add_argument("--output", default=str(CATALOG_DIR))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = Catalog.from_csv(Path(args.source))
+    catalog.save(Path(args.output))
+    print(f"Wrote {len(catalog)} rows (version {catalog.version}) to {args.output} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
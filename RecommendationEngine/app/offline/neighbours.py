@@ -0,0 +1,82 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from app.config import NEIGHBOUR_TABLE_FILE, NEIGHBOUR_TABLE_SIZE
+from app.service.neighbours import NeighbourTable, PREFERENCE_GRID
+from app.service.recommender import FragranceRecommender
+from app.service.scoring import top_k_indices
+
+
+_worker_recommender = None
+
+
+def _init_worker():
+    global _worker_recommender
+    _worker_recommender = FragranceRecommender()
+
+
+def _build_chunk(names, top_n):
+    recommender = _worker_recommender
+    top_n = min(top_n, len(recommender.feature_matrix))
+    indices = np.empty((len(names), len(PREFERENCE_GRID), top_n), dtype=np.int32)
+    # float64 like the live scores, so a table hit answers bit-for-bit the same.
+    scores = np.empty((len(names), len(PREFERENCE_GRID), top_n), dtype=np.float64)
+    for i, name in enumerate(names):
+        # Same mat-vec and scoring calls as the live path so the table ranks
+        # exactly like get_recommendations(diversity_factor=0).
+        user_vector = recommender.build_user_profile([name])
+        sims = recommender.feature_matrix @ recommender._query_vector(user_vector)
+        for g, (time_pref, season_pref) in enumerate(PREFERENCE_GRID):
+            final_scores = recommender.scoring.final_scores(sims, time_pref, season_pref)
+            top = top_k_indices(final_scores, top_n)
+            indices[i, g] = top
+            scores[i, g] = final_scores[top]
+    return indices, scores
+
+
+def build_neighbour_table(recommender, top_n=NEIGHBOUR_TABLE_SIZE, workers=None, chunk_size=256, names=None):
+    names = sorted(recommender.valid_names if names is None else names)
+    chunks = [names[i:i + chunk_size] for i in range(0, len(names), chunk_size)]
+    build = partial(_build_chunk, top_n=top_n)
+
+    if workers == 0:
+        global _worker_recommender
+        _worker_recommender = recommender
+        parts = [build(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            parts = list(pool.map(build, chunks))
+
+    return NeighbourTable(
+        names,
+        np.concatenate([p[0] for p in parts]),
+        np.concatenate([p[1] for p in parts]),
+        recommender.dataset_version,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the item-item neighbour table")
+    parser.add_argument("--output", default=str(NEIGHBOUR_TABLE_FILE))
+    parser.add_argument("--top-n", type=int, default=NEIGHBOUR_TABLE_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    recommender = FragranceRecommender()
+    table = build_neighbour_table(recommender, top_n=args.top_n, workers=args.workers)
+    table.save(args.output)
+    size_kb = os.path.getsize(args.output) / 1024
+    print(
+        f"Wrote {len(table.rows)} x {len(PREFERENCE_GRID)} x {table.top_n} neighbours "
+        f"to {args.output} ({size_kb:.0f} KiB) in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+from app.config import (
+    RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL_SECONDS,
+    RESULT_CACHE_ACCORD_PRECISION,
+)
+from app.model.schemas import RecommendationResponse
+from app.service.timing import current_timings
+
+
+class RecommendationCache:
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+        accord_precision: float = RESULT_CACHE_ACCORD_PRECISION,
+        redis_client=None,
+        clock=time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.accord_precision = accord_precision
+        self.redis = redis_client
+        self.clock = clock
+        self.version = None
+        self._entries = OrderedDict()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    def bind_version(self, version):
+        # Entries and counters only ever describe one dataset version; a new
+        # version starts from an empty local tier and Redis keys are namespaced
+        # by version so stale shared entries are simply never read again.
+        if version != self.version:
+            self.version = version
+            self._entries.clear()
+            self._reset_stats()
+
+    def fragrance_key(self, request, version=None):
+        return self._key("fragrances", version, {
+            "liked": sorted(set(request.liked_fragrances)),
+            **self._common_fields(request),
+        })
+
+    def accord_key(self, request, version=None):
+        step = self.accord_precision
+        return self._key("accords", version, {
+            "accords": sorted(
+                (accord, round(weight / step)) for accord, weight in request.accord_preferences.items()
+            ),
+            "step": step,
+            **self._common_fields(request),
+        })
+
+    @staticmethod
+    def _common_fields(request):
+        fields = {
+            "time": request.time_pref.value,
+            "season": request.season_pref.value,
+            "top_k": request.top_k,
+            "diversity": request.diversity_factor,
+        }
+        filters = request.filters.model_dump(mode="json", exclude_none=True) if request.filters else {}
+        if filters:
+            fields["filters"] = {
+                key: sorted(set(value)) if isinstance(value, list) else value
+                for key, value in filters.items()
+            }
+        return fields
+
+    def _key(self, kind, version, canonical):
+        # Callers pass the version of the snapshot they answer from, so a
+        # request that straddles a reload never files its result under the
+        # new version.
+        digest = hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()[:32]
+        return f"rec:{self.version if version is None else version}:{kind}:{digest}"
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        if self.redis is not None:
+            timings = current_timings()
+            if timings:
+                timings.mark()
+            try:
+                payload = await self.redis.get(key)
+            except Exception:
+                self.redis_errors += 1
+                payload = None
+            if timings:
+                timings.lap("cache_redis")
+            if payload is not None:
+                value = [RecommendationResponse.model_validate(item) for item in json.loads(payload)]
+                self._store_local(key, value)
+                self.redis_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key, value):
+        self._store_local(key, value)
+        if self.redis is not None:
+            timings = current_timings()
+            if timings:
+                timings.mark()
+            payload = json.dumps([item.model_dump() for item in value])
+            try:
+                await self.redis.set(key, payload, ex=max(1, int(self.ttl_seconds)))
+            except Exception:
+                self.redis_errors += 1
+            if timings:
+                timings.lap("cache_redis")
+
+    def _store_local(self, key, value):
+        self._entries[key] = (self.clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "redis_errors": self.redis_errors,
+        }
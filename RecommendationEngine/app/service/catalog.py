@@ -0,0 +1,195 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from app.config import NUMERIC_FEATURE_COLS, ACCORD_COLS, DATA_FILE, CATALOG_DIR
+from app.service.scoring import l2_normalize
+
+
+CATALOG_FORMAT_VERSION = 1
+
+CATALOG_NUMERIC_COLS = [
+    "ratingValue", "ratingCount", "gender_score", "priceValue_score",
+    "timeOfDay_score", "season_score",
+] + ACCORD_COLS
+
+STRING_TABLES = ["names", "brands", "notes"]
+
+
+def dataset_version(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+class StringTable:
+    # UTF-8 blob plus an offsets array: both are plain .npy files, so the
+    # table can be memory-mapped and strings decoded only when accessed.
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.array([len(b) for b in encoded], dtype=np.int64), out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def tolist(self):
+        blob = self.data.tobytes()
+        bounds = self.offsets.tolist()
+        return [blob[a:b].decode("utf-8") for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+class Catalog:
+    def __init__(self, numeric, features, names, brands, notes, version, source=None):
+        self.numeric = numeric
+        self.features = features
+        self.names = names
+        self.brands = brands
+        self.notes = notes
+        self.version = version
+        self.source = source
+        self._column_index = {col: i for i, col in enumerate(CATALOG_NUMERIC_COLS)}
+        self._feature_index = [self._column_index[col] for col in NUMERIC_FEATURE_COLS]
+
+    def __len__(self):
+        return self.numeric.shape[0]
+
+    def __getitem__(self, column):
+        return self.numeric[:, self._column_index[column]]
+
+    def feature_values(self, rows):
+        return self.numeric[rows][:, self._feature_index]
+
+    def row(self, i):
+        return dict(zip(CATALOG_NUMERIC_COLS, self.numeric[i].tolist()))
+
+    @classmethod
+    def from_columns(cls, numeric, names, brands, notes, version, source=None):
+        numeric = np.asfortranarray(numeric, dtype=np.float64)
+        feature_index = [CATALOG_NUMERIC_COLS.index(col) for col in NUMERIC_FEATURE_COLS]
+        return cls(
+            numeric=numeric,
+            features=l2_normalize(numeric[:, feature_index]),
+            names=StringTable.from_strings(names),
+            brands=StringTable.from_strings(brands),
+            notes=StringTable.from_strings(notes),
+            version=version,
+            source=source,
+        )
+
+    @classmethod
+    def from_dataframe(cls, df, version):
+        return cls.from_columns(
+            df[CATALOG_NUMERIC_COLS].to_numpy(dtype=np.float64),
+            df["name"].tolist(),
+            df["brand"].tolist(),
+            df["notesBreakdown"].tolist(),
+            version,
+        )
+
+    @classmethod
+    def from_csv(cls, path=DATA_FILE):
+        # Plain csv + float() parses this file bit-for-bit like pd.read_csv,
+        # which keeps pandas off the serving path entirely.
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        numeric = np.array(
+            [[float(r[col]) if r[col] != "" else np.nan for col in CATALOG_NUMERIC_COLS] for r in rows],
+            dtype=np.float64,
+        ).reshape(len(rows), len(CATALOG_NUMERIC_COLS))
+        return cls.from_columns(
+            numeric,
+            [r["name"] for r in rows],
+            [r["brand"] for r in rows],
+            [r["notesBreakdown"] for r in rows],
+            dataset_version(path),
+            source=path,
+        )
+
+    def to_dataframe(self):
+        import pandas as pd
+        df = pd.DataFrame({"name": self.names.tolist(), "brand": self.brands.tolist()})
+        for col in CATALOG_NUMERIC_COLS:
+            df[col] = np.array(self[col])
+        df["notesBreakdown"] = self.notes.tolist()
+        return df
+
+    def save(self, directory=CATALOG_DIR):
+        # Written to a sibling directory and renamed into place so a reader
+        # never observes a half-written artifact.
+        tmp = directory.with_name(directory.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        np.save(tmp / "numeric.npy", self.numeric)
+        np.save(tmp / "features.npy", self.features)
+        for key in STRING_TABLES:
+            table = getattr(self, key)
+            np.save(tmp / f"{key}_data.npy", table.data)
+            np.save(tmp / f"{key}_offsets.npy", table.offsets)
+        manifest = {
+            "format": CATALOG_FORMAT_VERSION,
+            "version": self.version,
+            "rows": len(self),
+            "numeric_columns": CATALOG_NUMERIC_COLS,
+            "feature_columns": NUMERIC_FEATURE_COLS,
+        }
+        (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2))
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+
+    @staticmethod
+    def read_manifest(directory=CATALOG_DIR):
+        path = directory / "manifest.json"
+        if not path.exists():
+            return None
+        manifest = json.loads(path.read_text())
+        if (
+            manifest.get("format") != CATALOG_FORMAT_VERSION
+            or manifest.get("numeric_columns") != CATALOG_NUMERIC_COLS
+            or manifest.get("feature_columns") != NUMERIC_FEATURE_COLS
+        ):
+            return None
+        return manifest
+
+    @classmethod
+    def load(cls, directory=CATALOG_DIR, manifest=None):
+        manifest = manifest or cls.read_manifest(directory)
+        if manifest is None:
+            raise ValueError(f"{directory} is not a compatible catalog artifact")
+
+        def mmap(name):
+            return np.asarray(np.load(directory / name, mmap_mode="r"))
+
+        tables = {
+            key: StringTable(mmap(f"{key}_data.npy"), mmap(f"{key}_offsets.npy"))
+            for key in STRING_TABLES
+        }
+        return cls(
+            numeric=mmap("numeric.npy"),
+            features=mmap("features.npy"),
+            version=manifest["version"],
+            source=directory,
+            **tables,
+        )
+
+    @classmethod
+    def open(cls, csv_path=DATA_FILE, directory=CATALOG_DIR):
+        version = dataset_version(csv_path)
+        manifest = cls.read_manifest(directory)
+        if manifest is not None and manifest["version"] == version:
+            return cls.load(directory, manifest)
+        if manifest is not None:
+            print(f"Ignoring stale catalog artifact {directory} (built for {manifest['version']})")
+        return cls.from_csv(csv_path)
@@ -0,0 +1,171 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.config import RECOMMENDER_EXECUTOR, RECOMMENDER_WORKERS, RECOMMENDER_MAX_IN_FLIGHT
+from app.service.timing import current_timings
+
+
+class RecommenderBusy(Exception):
+    pass
+
+
+_worker_recommender = None
+
+
+def _init_worker():
+    global _worker_recommender
+    from app.service.recommender import FragranceRecommender
+    _worker_recommender = FragranceRecommender()
+
+
+def _call_in_worker(version, source, method, args, kwargs):
+    # After a dataset reload the first call in each worker brings its copy
+    # up to the caller's version.
+    global _worker_recommender
+    if _worker_recommender is None or _worker_recommender.dataset_version != version:
+        from app.service.snapshot import load_recommender
+        _worker_recommender = load_recommender(source)
+        if _worker_recommender.dataset_version != version:
+            raise RuntimeError(f"Worker loaded dataset {_worker_recommender.dataset_version}, expected {version}")
+    return getattr(_worker_recommender, method)(*args, **kwargs)
+
+
+def _collect_in_worker(version, source, method, args, kwargs):
+    # Generators cannot cross the process boundary, so a streamed call is
+    # drained in the worker and sent back whole.
+    return list(_call_in_worker(version, source, method, args, kwargs))
+
+
+class RecommendationExecutor:
+    # Runs recommender methods off the event loop. "thread" shares the
+    # serving recommender (NumPy releases the GIL in the heavy kernels),
+    # "process" gives each worker its own copy loaded from the catalog
+    # artifact, "inline" runs on the loop as before. At most max_in_flight
+    # calls are queued or running; beyond that requests are shed with
+    # RecommenderBusy instead of piling up behind the pool.
+    def __init__(self, recommender, kind=RECOMMENDER_EXECUTOR, workers=RECOMMENDER_WORKERS,
+                 max_in_flight=RECOMMENDER_MAX_IN_FLIGHT):
+        if kind not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.recommender = recommender
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or max(32, 8 * self.workers)
+        self.in_flight = 0
+        self.rejected = 0
+        self._pool = None
+
+    def _get_pool(self):
+        # Created on first use so importing the app never starts workers.
+        if self._pool is None:
+            if self.kind == "thread":
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="recommender")
+            else:
+                self._pool = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker
+                )
+        return self._pool
+
+    async def run(self, method, *args, **kwargs):
+        return await self.run_on(self.recommender, method, *args, **kwargs)
+
+    def _admit(self):
+        if self.in_flight >= self.max_in_flight:
+            self.rejected += 1
+            raise RecommenderBusy(f"{self.in_flight} recommendation requests already in flight")
+
+    async def run_on(self, recommender, method, *args, **kwargs):
+        # Takes the recommender explicitly so a request stays on the dataset
+        # snapshot it started with even if a reload swaps self.recommender.
+        self._admit()
+        if self.kind == "inline":
+            return getattr(recommender, method)(*args, **kwargs)
+
+        # in_flight is only touched on the event loop thread, so no lock.
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            timings = current_timings()
+            submitted = time.perf_counter()
+            if self.kind == "thread":
+                context = contextvars.copy_context()
+                return await loop.run_in_executor(
+                    self._get_pool(), context.run, self._call_in_thread, recommender, submitted, method, args, kwargs
+                )
+            result = await loop.run_in_executor(
+                self._get_pool(), _call_in_worker,
+                recommender.dataset_version, recommender.catalog.source, method, args, kwargs,
+            )
+            if timings:
+                # Stage spans cannot cross the process boundary; report the
+                # whole round trip instead.
+                timings.add("executor_process", (time.perf_counter() - submitted) * 1000)
+            return result
+        finally:
+            self.in_flight -= 1
+
+    def stream_on(self, recommender, method, *args, **kwargs):
+        # Async iterator over a generator method. The slot is taken now, so
+        # RecommenderBusy is raised before a response starts, and held until
+        # the stream is exhausted or closed; a stream that is dropped
+        # without ever being iterated gives its slot back when collected.
+        self._admit()
+        self.in_flight += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.in_flight -= 1
+
+        async def items():
+            try:
+                if self.kind == "inline":
+                    for item in getattr(recommender, method)(*args, **kwargs):
+                        yield item
+                    return
+                loop = asyncio.get_running_loop()
+                if self.kind == "process":
+                    batch = await loop.run_in_executor(
+                        self._get_pool(), _collect_in_worker,
+                        recommender.dataset_version, recommender.catalog.source, method, args, kwargs,
+                    )
+                    for item in batch:
+                        yield item
+                    return
+                # One pool hop per item keeps the stream incremental.
+                context = contextvars.copy_context()
+                iterator = await loop.run_in_executor(
+                    self._get_pool(), context.run, self._call_in_thread,
+                    recommender, time.perf_counter(), method, args, kwargs,
+                )
+                done = object()
+                while (item := await loop.run_in_executor(self._get_pool(), context.run, next, iterator, done)) is not done:
+                    yield item
+            finally:
+                release()
+
+        stream = items()
+        weakref.finalize(stream, release)
+        return stream
+
+    @staticmethod
+    def _call_in_thread(recommender, submitted, method, args, kwargs):
+        timings = current_timings()
+        if timings:
+            timings.add("executor_queue", (time.perf_counter() - submitted) * 1000)
+        return getattr(recommender, method)(*args, **kwargs)
+
+    def stats(self):
+        return {"kind": self.kind, "workers": self.workers, "in_flight": self.in_flight, "rejected": self.rejected}
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,58 @@
+import numpy as np
+
+from app.model.schemas import GenderLabel, PriceValueLabel
+
+
+# Upper (inclusive) bounds of each label bucket, matching
+# FragranceRecommender.get_gender_label / format_price_value; anything above
+# the last edge, including NaN, falls into the last label.
+GENDER_EDGES = [-0.9, -0.3, 0.3, 0.9]
+PRICE_EDGES = [-1.5, -0.5, 0.5, 1.5]
+
+
+def label_masks(scores, edges, labels):
+    codes = np.searchsorted(edges, scores, side="left")
+    return {label: codes == i for i, label in enumerate(labels)}
+
+
+class AttributeMasks:
+    # Boolean row masks for the categorical filters are built once at load;
+    # brands are stored as integer codes (one mask per brand would not scale
+    # with the catalog) and ratings are compared on demand.
+    def __init__(self, catalog, brands):
+        self.size = len(catalog)
+        self.gender = label_masks(np.asarray(catalog["gender_score"]), GENDER_EDGES, list(GenderLabel))
+        self.price = label_masks(np.asarray(catalog["priceValue_score"]), PRICE_EDGES, list(PriceValueLabel))
+        self.brand_codes_by_name = {}
+        self.brand_codes = np.array(
+            [self.brand_codes_by_name.setdefault(brand.strip(), len(self.brand_codes_by_name)) for brand in brands],
+            dtype=np.int32,
+        )
+        self.rating_value = np.asarray(catalog["ratingValue"])
+        self.rating_count = np.asarray(catalog["ratingCount"])
+
+    def _brand_mask(self, brands):
+        codes = [self.brand_codes_by_name[b.strip()] for b in brands if b.strip() in self.brand_codes_by_name]
+        return np.isin(self.brand_codes, codes)
+
+    def mask(self, filters):
+        # Returns None when nothing is filtered so callers keep the unfiltered
+        # fast paths.
+        if filters is None:
+            return None
+        parts = []
+        if filters.genders:
+            parts.append(np.logical_or.reduce([self.gender[g] for g in filters.genders]))
+        if filters.price_values:
+            parts.append(np.logical_or.reduce([self.price[p] for p in filters.price_values]))
+        if filters.include_brands:
+            parts.append(self._brand_mask(filters.include_brands))
+        if filters.exclude_brands:
+            parts.append(~self._brand_mask(filters.exclude_brands))
+        if filters.min_rating is not None:
+            parts.append(self.rating_value >= filters.min_rating)
+        if filters.min_rating_count is not None:
+            parts.append(self.rating_count >= filters.min_rating_count)
+        if not parts:
+            return None
+        return np.logical_and.reduce(parts)
@@ -0,0 +1,114 @@
+import unicodedata
+from bisect import bisect_left
+from functools import cached_property
+
+import numpy as np
+
+
+def normalize(text):
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def bounded_edit_distance(a, b, max_distance, prefix=False):
+    # Levenshtein distance with an early exit once every cell in a row
+    # exceeds max_distance; returns max_distance + 1 in that case. With
+    # prefix=True it is the distance from a to the closest prefix of b.
+    if len(b) - len(a) > max_distance and not prefix or len(a) - len(b) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return min(previous) if prefix else previous[-1]
+
+
+def allowed_typos(token):
+    if len(token) >= 8:
+        return 2
+    if len(token) >= 4:
+        return 1
+    return 0
+
+
+class NameIndex:
+    # Sorted-array prefix index over "brand name" and every word suffix of
+    # it, so "oud", "nishane oud" and "36" all complete to Oudh 36. The
+    # name -> rows map is built eagerly; the search structures are built on
+    # first use so they add nothing to cold start.
+    def __init__(self, names, brands):
+        self.rows_by_name = {}
+        for row, name in enumerate(names):
+            self.rows_by_name.setdefault(name.strip(), []).append(row)
+        self.entries = sorted({(brand.strip(), name.strip()) for brand, name in zip(brands, names)})
+        self._fuzzy_cache = {}
+
+    @cached_property
+    def _prefix_index(self):
+        keyed = []
+        tokens = {}
+        for entry_id, (brand, name) in enumerate(self.entries):
+            words = normalize(f"{brand} {name}").split(" ")
+            for start in range(len(words)):
+                keyed.append((" ".join(words[start:]), entry_id))
+            for word in words:
+                tokens.setdefault(word, set()).add(entry_id)
+        keyed.sort()
+        return [key for key, _ in keyed], [entry_id for _, entry_id in keyed], tokens
+
+    def rows_for(self, names):
+        rows = {row for name in names for row in self.rows_by_name.get(name, ())}
+        return np.array(sorted(rows), dtype=np.intp)
+
+    def search(self, query, limit=20, fuzzy=False):
+        query = normalize(query)
+        if not query:
+            return []
+        entry_ids = self._prefix_matches(query, limit)
+        if fuzzy and len(entry_ids) < limit:
+            for entry_id in self._fuzzy_matches(query):
+                if entry_id not in entry_ids:
+                    entry_ids.append(entry_id)
+                    if len(entry_ids) >= limit:
+                        break
+        return [self.entries[i] for i in entry_ids[:limit]]
+
+    def _prefix_matches(self, query, limit):
+        keys, key_entries, _ = self._prefix_index
+        seen = {}
+        i = bisect_left(keys, query)
+        while i < len(keys) and keys[i].startswith(query) and len(seen) < limit:
+            seen.setdefault(key_entries[i], None)
+            i += 1
+        return list(seen)
+
+    def _fuzzy_matches(self, query):
+        # Every complete query word must match an indexed word within its
+        # typo budget; the last word may still be a prefix being typed.
+        words = query.split(" ")
+        candidates = None
+        for position, word in enumerate(words):
+            matched = self._fuzzy_word(word, position == len(words) - 1)
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+        return sorted(candidates)
+
+    def _fuzzy_word(self, word, is_prefix):
+        cached = self._fuzzy_cache.get((word, is_prefix))
+        if cached is not None:
+            return cached
+        budget = allowed_typos(word)
+        matched = set()
+        for token, entry_ids in self._prefix_index[2].items():
+            if bounded_edit_distance(word, token, budget, prefix=is_prefix) <= budget:
+                matched |= entry_ids
+        if len(self._fuzzy_cache) >= 4096:
+            self._fuzzy_cache.clear()
+        self._fuzzy_cache[(word, is_prefix)] = matched
+        return matched
@@ -0,0 +1,55 @@
+import numpy as np
+from app.model.schemas import TimePreference, SeasonPreference
+from app.service.catalog import StringTable
+
+
+NEIGHBOUR_TABLE_FORMAT = 3
+
+PREFERENCE_GRID = [(t, s) for t in TimePreference for s in SeasonPreference]
+GRID_INDEX = {pair: i for i, pair in enumerate(PREFERENCE_GRID)}
+
+
+class NeighbourTable:
+    def __init__(self, names, indices, scores, version):
+        self.rows = {name: i for i, name in enumerate(names)}
+        self.indices = indices
+        self.scores = scores
+        self.version = version
+        self.top_n = indices.shape[2]
+
+    @classmethod
+    def load(cls, path, expected_version):
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as data:
+            if "format" not in data.files or int(data["format"]) != NEIGHBOUR_TABLE_FORMAT:
+                print(f"Ignoring neighbour table {path.name} with an unsupported format")
+                return None
+            version = str(data["version"])
+            if version != expected_version:
+                print(f"Ignoring stale neighbour table {path.name} (built for {version})")
+                return None
+            names = StringTable(data["names_data"], data["names_offsets"]).tolist()
+            return cls(names, data["indices"], data["scores"], version)
+
+    def save(self, path):
+        # Stored uncompressed: inflating the table dominated cold start, and
+        # uint16 row ids keep it small for catalogs under 65k rows.
+        names = StringTable.from_strings(sorted(self.rows, key=self.rows.get))
+        index_dtype = np.uint16 if self.indices.max(initial=0) < 2 ** 16 else np.int32
+        np.savez(
+            path,
+            names_data=names.data,
+            names_offsets=names.offsets,
+            indices=self.indices.astype(index_dtype),
+            scores=self.scores,
+            version=np.array(self.version),
+            format=np.array(NEIGHBOUR_TABLE_FORMAT),
+        )
+
+    def lookup(self, name, time_pref, season_pref, top_k):
+        row = self.rows.get(name)
+        if row is None or top_k > self.top_n:
+            return None
+        grid = GRID_INDEX[(TimePreference(time_pref), SeasonPreference(season_pref))]
+        return self.indices[row, grid, :top_k], self.scores[row, grid, :top_k]
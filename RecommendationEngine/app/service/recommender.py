@@ -1,43 +1,47 @@
-import pandas as pd
+from typing import Optional
+
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from app.config import NUMERIC_FEATURE_COLS, ACCORD_COLS, DATA_FILE
-from app.model.schemas import TimePreference, SeasonPreference, RecommendationResponse
+from app.config import NUMERIC_FEATURE_COLS, ACCORD_COLS, NEIGHBOUR_TABLE_FILE, IVF_PRIOR_CANDIDATES
+from app.model.schemas import TimePreference, SeasonPreference, RecommendationResponse, RecommendationFilters
+from app.service.catalog import Catalog
+from app.service.filters import AttributeMasks
+from app.service.name_index import NameIndex
+from app.service.neighbours import NeighbourTable
+from app.service.retrieval import build_retriever
+from app.service.scoring import ScoringEngine, SIMILARITY_WEIGHT, l2_normalize, top_k_indices
+from app.service.timing import current_timings
 
 
 class FragranceRecommender:
-    def __init__(self):
-        self.df = pd.read_csv(DATA_FILE)
-        self.valid_names = set(self.df["name"].str.strip().values)
-        self.valid_names_brands = set(
-            self.df.apply(lambda r: (r["brand"].strip(), r["name"].strip()), axis=1)
-        )
+    def __init__(self, catalog=None, retriever=None, neighbour_table=NEIGHBOUR_TABLE_FILE):
+        self.catalog = catalog or Catalog.open()
+        self.dataset_version = self.catalog.version
+        self.names = self.catalog.names.tolist()
+        self.brands = self.catalog.brands.tolist()
+        self.name_index = NameIndex(self.names, self.brands)
+        self.valid_names = set(self.name_index.rows_by_name)
+        self.valid_names_brands = set(self.name_index.entries)
+        self.feature_matrix = self.catalog.features
+        self.scoring = ScoringEngine(self.catalog)
+        self.attribute_masks = AttributeMasks(self.catalog, self.brands)
+        self.retriever = retriever or build_retriever(self.feature_matrix)
+        self.neighbours = NeighbourTable.load(neighbour_table, self.dataset_version)
+        self._retrieval_priors = {}
+        self._df = None
 
-    @staticmethod
-    def calculate_rating_score(row):
-        C, m = 10, 3.0
-        v, n = row["ratingValue"], row["ratingCount"]
-        return (v * n + m * C) / (n + C)
+    @property
+    def df(self):
+        # Only tooling and tests need the tabular view; the serving path works
+        # directly on the catalog arrays.
+        if self._df is None:
+            self._df = self.catalog.to_dataframe()
+        return self._df
 
     @staticmethod
     def get_dominant_accords(row, threshold=0.30):
         accords = {c: row[c] for c in ACCORD_COLS if row[c] > threshold}
         return sorted(accords.items(), key=lambda x: x[1], reverse=True)
 
-    @staticmethod
-    def calculate_time_score(row, time_pref):
-        if time_pref == TimePreference.both:
-            return 1.0
-        score = row["timeOfDay_score"]
-        return ((score if time_pref == TimePreference.day else -score) + 2) / 4
-
-    @staticmethod
-    def calculate_season_score(row, season_pref):
-        if season_pref == SeasonPreference.both:
-            return 1.0
-        score = row["season_score"]
-        return ((-score if season_pref == SeasonPreference.cold else score) + 2) / 4
-
     @staticmethod
     def get_gender_label(score):
         if score <= -0.9:
@@ -63,32 +67,43 @@ class FragranceRecommender:
         return "Excellent Value"
 
     @staticmethod
-    def mmr_re_rank(df, feature_cols, k, lambda_):
-        if df.empty:
-            return df
-
-        selected, remaining = [], df.index.tolist()
-        vectors = df[feature_cols].values
-        sim_mat = cosine_similarity(vectors, vectors)
-
-        while len(selected) < k and remaining:
-            if not selected:
-                best = remaining[0]
-            else:
-                mmr_scores = []
-                for idx in remaining:
-                    relevance = df.at[idx, "final_score"]
-                    novelty = sim_mat[idx, selected].max()
-                    mmr_scores.append(lambda_ * relevance - (1 - lambda_) * novelty)
-                best = remaining[int(np.argmax(mmr_scores))]
-            selected.append(best)
-            remaining.remove(best)
-
-        return df.loc[selected]
+    def mmr_re_rank(vectors, relevance, k, lambda_):
+        # Greedy MMR over a relevance-sorted candidate pool. Returns positions
+        # into the pool in selection order. Instead of re-scanning every
+        # candidate against every selected item, a running max-similarity
+        # vector is updated with one column of the pool's Gram matrix per pick.
+        k = min(k, len(relevance))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if lambda_ >= 1:
+            return np.arange(k)
+
+        sim_mat = (vectors @ vectors.T).astype(np.float64)
+        relevance = lambda_ * np.asarray(relevance, dtype=np.float64)
+        selected = np.empty(k, dtype=np.intp)
+        available = np.ones(len(relevance), dtype=bool)
+
+        selected[0] = 0
+        available[0] = False
+        novelty = sim_mat[:, 0].copy()
+        for i in range(1, k):
+            mmr_scores = relevance - (1 - lambda_) * novelty
+            mmr_scores[~available] = -np.inf
+            best = int(np.argmax(mmr_scores))
+            selected[i] = best
+            available[best] = False
+            np.maximum(novelty, sim_mat[:, best], out=novelty)
+        return selected
 
     def build_user_profile(self, liked_fragrances):
-        liked_df = self.df[self.df["name"].isin(liked_fragrances)].copy()
-        return liked_df[NUMERIC_FEATURE_COLS].mean(axis=0).values
+        rows = self.name_index.rows_for(liked_fragrances)
+        return self.catalog.feature_values(rows).mean(axis=0)
+
+    @staticmethod
+    def _query_vector(user_vector):
+        if not np.all(np.isfinite(user_vector)):
+            raise ValueError("User vector contains NaN or infinity")
+        return l2_normalize(user_vector)
 
     def get_recommendations(
         self,
@@ -97,57 +112,178 @@ class FragranceRecommender:
         season_pref: SeasonPreference,
         top_k: int = 5,
         diversity_factor: float = 0.0,
+        filters: Optional[RecommendationFilters] = None,
     ):
-        sims = cosine_similarity(user_vector.reshape(1, -1), self.df[NUMERIC_FEATURE_COLS].values)[0]
-
-        temp = self.df.copy()
-        temp["similarity"] = sims
-        temp["rating_score"] = temp.apply(self.calculate_rating_score, axis=1)
-        temp["time_match"] = temp.apply(lambda r: self.calculate_time_score(r, time_pref), axis=1)
-        temp["season_match"] = temp.apply(lambda r: self.calculate_season_score(r, season_pref), axis=1)
-
-        for col in ["rating_score", "priceValue_score"]:
-            temp[f"{col}_norm"] = (temp[col] - temp[col].min()) / (temp[col].max() - temp[col].min() + 1e-9)
-
-        sim_w = 0.35 * (1 - diversity_factor)
-        temp["final_score"] = (
-            sim_w * temp["similarity"]
-            + 0.20 * temp["rating_score_norm"]
-            + 0.15 * temp["priceValue_score_norm"]
-            + 0.15 * temp["time_match"]
-            + 0.15 * temp["season_match"]
+        timings = current_timings()
+        if timings:
+            timings.mark()
+        hints = self._retrieval_hints(time_pref, season_pref, diversity_factor, self.attribute_masks.mask(filters))
+        rows, sims = self.retriever.search(self._query_vector(user_vector), **hints)
+        if timings:
+            timings.lap("retrieval")
+        return self._rank(sims, time_pref, season_pref, top_k, diversity_factor, rows)
+
+    def _retrieval_hints(self, time_pref, season_pref, diversity_factor, mask=None):
+        # Filtered-out rows are never scored. Approximate backends only see
+        # similarities, so they are also told how much similarity weighs and
+        # where the best-scoring rows live.
+        hints = {} if mask is None else {"mask": mask}
+        if self.retriever.exact:
+            return hints
+        key = (TimePreference(time_pref), SeasonPreference(season_pref))
+        if key not in self._retrieval_priors:
+            prior = self.scoring.prior_scores(*key)
+            self._retrieval_priors[key] = (
+                self.retriever.list_max(prior),
+                np.sort(top_k_indices(prior, IVF_PRIOR_CANDIDATES)),
+            )
+        list_bonus, extra_rows = self._retrieval_priors[key]
+        hints.update(
+            sim_weight=SIMILARITY_WEIGHT * (1 - diversity_factor),
+            list_bonus=list_bonus,
+            extra_rows=extra_rows,
         )
+        return hints
 
-        pool_size = max(30, top_k * 10)
-        candidates = (
-            temp
-            .sort_values("final_score", ascending=False)
-            .head(pool_size)
-            .reset_index(drop=True)
+    def iter_batch_recommendations(
+        self,
+        user_vectors,
+        time_prefs: list[TimePreference],
+        season_prefs: list[SeasonPreference],
+        top_ks: list[int],
+        diversity_factors: list[float],
+        filters: Optional[list[Optional[RecommendationFilters]]] = None,
+        chunk_size: int = 256,
+    ):
+        timings = current_timings()
+        if timings:
+            timings.mark()
+        queries = self._query_vector(np.asarray(user_vectors, dtype=np.float32))
+        masks = [self.attribute_masks.mask(f) for f in filters] if filters else [None] * len(queries)
+        hints = None
+        if not self.retriever.exact or any(m is not None for m in masks):
+            hints = [
+                self._retrieval_hints(*args)
+                for args in zip(time_prefs, season_prefs, diversity_factors, masks)
+            ]
+        results = self.retriever.search_batch(queries, hints, chunk_size=chunk_size)
+        for i, (rows, sims) in enumerate(results):
+            if timings:
+                timings.lap("retrieval")
+            yield self._rank(sims, time_prefs[i], season_prefs[i], top_ks[i], diversity_factors[i], rows)
+
+    def get_batch_recommendations(self, user_vectors, time_prefs, season_prefs, top_ks, diversity_factors, filters=None):
+        return list(self.iter_batch_recommendations(
+            user_vectors, time_prefs, season_prefs, top_ks, diversity_factors, filters
+        ))
+
+    def iter_batch_recommendations_by_names(self, liked_fragrances, time_prefs, season_prefs, top_ks,
+                                            diversity_factors, filters=None):
+        # Profiles are built here rather than by the caller so the whole
+        # batch runs wherever the executor puts it, not on the event loop.
+        user_vectors = [self.build_user_profile(liked) for liked in liked_fragrances]
+        return self.iter_batch_recommendations(
+            user_vectors, time_prefs, season_prefs, top_ks, diversity_factors, filters
         )
+
+    def get_batch_recommendations_by_names(self, liked_fragrances, time_prefs, season_prefs, top_ks,
+                                           diversity_factors, filters=None):
+        return list(self.iter_batch_recommendations_by_names(
+            liked_fragrances, time_prefs, season_prefs, top_ks, diversity_factors, filters
+        ))
+
+    def _rank(self, sims, time_pref, season_pref, top_k, diversity_factor, rows=None):
+        # sims cover the whole catalog, or only `rows` when an approximate
+        # retriever produced a candidate subset.
+        timings = current_timings()
+        final_scores = self.scoring.final_scores(sims, time_pref, season_pref, diversity_factor, rows)
+        if timings:
+            timings.lap("scoring")
+
+        # Unrated rows score NaN; a filter can leave them in the pool, where
+        # MMR's argmax would pick them first and the response would not validate.
+        finite = np.isfinite(final_scores)
+        if not finite.all():
+            rows = np.flatnonzero(finite) if rows is None else rows[finite]
+            final_scores = final_scores[finite]
+
+        pool_size = max(30, top_k * 10)
+        top = top_k_indices(final_scores, pool_size)
+        top_rows = top if rows is None else rows[top]
+        if timings:
+            timings.lap("candidate_sort")
         lambda_ = 1 - diversity_factor
-        diversified = (
-            self.mmr_re_rank(candidates, NUMERIC_FEATURE_COLS, k=top_k, lambda_=lambda_)
-            .sort_values("final_score", ascending=False)
-        )
+        picks = self.mmr_re_rank(self.feature_matrix[top_rows], final_scores[top], k=top_k, lambda_=lambda_)
+        chosen = top[picks]
+        chosen = chosen[np.argsort(-final_scores[chosen], kind="stable")]
+        chosen_rows = chosen if rows is None else rows[chosen]
+        if timings:
+            timings.lap("mmr")
+        responses = self._build_responses(chosen_rows, final_scores[chosen])
+        if timings:
+            timings.lap("build_response")
+        return responses
 
+    def _build_responses(self, rows, scores):
+        catalog = self.catalog
         results = []
-        for _, row in diversified.iterrows():
+        for row, score in zip(rows.tolist(), scores.tolist()):
+            values = catalog.row(row)
             results.append(
                 RecommendationResponse(
-                    name=row["name"],
-                    brand=row["brand"],
-                    rating_value=row["ratingValue"],
-                    rating_count=row["ratingCount"],
-                    gender_label=self.get_gender_label(row["gender_score"]),
-                    price_value_label=self.format_price_value(row["priceValue_score"]),
-                    match_score=float(row["final_score"]),
-                    dominant_accords=self.get_dominant_accords(row),
-                    notes_breakdown=row["notesBreakdown"],
+                    name=self.names[row],
+                    brand=self.brands[row],
+                    rating_value=values["ratingValue"],
+                    rating_count=values["ratingCount"],
+                    gender_label=self.get_gender_label(values["gender_score"]),
+                    price_value_label=self.format_price_value(values["priceValue_score"]),
+                    match_score=score,
+                    dominant_accords=self.get_dominant_accords(values),
+                    notes_breakdown=catalog.notes[row],
                 )
             )
         return results
 
+    def get_recommendations_by_names(
+        self,
+        liked_fragrances: list[str],
+        time_pref: TimePreference,
+        season_pref: SeasonPreference,
+        top_k: int = 5,
+        diversity_factor: float = 0.0,
+        filters: Optional[RecommendationFilters] = None,
+    ):
+        # Single-seed requests without diversity or filters only depend on
+        # the seed and the time/season grid, so they are answered from the
+        # offline table.
+        timings = current_timings()
+        if timings:
+            timings.mark()
+        if (
+            self.neighbours is not None and diversity_factor == 0
+            and self.attribute_masks.mask(filters) is None and len(set(liked_fragrances)) == 1
+        ):
+            hit = self.neighbours.lookup(liked_fragrances[0], time_pref, season_pref, top_k)
+            if hit is not None:
+                if timings:
+                    timings.lap("neighbour_lookup")
+                responses = self._build_responses(*hit)
+                if timings:
+                    timings.lap("build_response")
+                return responses
+
+        user_vector = self.build_user_profile(liked_fragrances)
+        if timings:
+            timings.lap("profile")
+        return self.get_recommendations(
+            user_vector,
+            time_pref,
+            season_pref,
+            top_k,
+            diversity_factor,
+            filters,
+        )
+
     def get_recommendations_by_accords(
         self,
         accord_preferences: dict[str, float],
@@ -155,6 +291,7 @@ class FragranceRecommender:
         season_pref: SeasonPreference,
         top_k: int = 5,
         diversity_factor: float = 0.0,
+        filters: Optional[RecommendationFilters] = None,
     ):
         invalid = set(accord_preferences) - set(ACCORD_COLS)
         if invalid:
@@ -176,4 +313,5 @@ class FragranceRecommender:
             season_pref=season_pref,
             top_k=top_k,
             diversity_factor=diversity_factor,
+            filters=filters,
         )
@@ -0,0 +1,142 @@
+import math
+
+import numpy as np
+
+from app.config import (
+    RETRIEVAL_BACKEND, ANN_MIN_ROWS, IVF_N_LISTS, IVF_N_PROBE, IVF_TRAIN_ITERATIONS,
+)
+
+
+class ExactRetriever:
+    # Brute-force cosine scan; rows=None means the similarities cover the
+    # whole catalog in row order. With a filter mask only the allowed rows
+    # are scored. Other scoring hints are only used by approximate backends.
+    exact = True
+
+    def __init__(self, features):
+        self.features = features
+
+    def search(self, query, mask=None, **hints):
+        if mask is None:
+            return None, self.features @ query
+        rows = np.flatnonzero(mask)
+        return rows, self.features[rows] @ query
+
+    def search_batch(self, queries, hints=None, chunk_size=256):
+        masks = [h.get("mask") for h in hints] if hints else [None] * len(queries)
+        for start in range(0, len(queries), chunk_size):
+            chunk = queries[start:start + chunk_size]
+            chunk_masks = masks[start:start + chunk_size]
+            if all(m is None for m in chunk_masks):
+                for sims in chunk @ self.features.T:
+                    yield None, sims
+                continue
+            plain = [i for i, m in enumerate(chunk_masks) if m is None]
+            plain_sims = dict(zip(plain, chunk[plain] @ self.features.T)) if plain else {}
+            for i, mask in enumerate(chunk_masks):
+                yield (None, plain_sims[i]) if mask is None else self.search(chunk[i], mask)
+
+
+def spherical_kmeans(features, n_clusters, iterations=IVF_TRAIN_ITERATIONS, sample_size=None, seed=0):
+    # Lloyd iterations on unit vectors with dot-product assignment; empty
+    # clusters are re-seeded from random training points.
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(features), sample_size or 64 * n_clusters)
+    train = features[rng.choice(len(features), sample_size, replace=False)]
+    centroids = train[rng.choice(len(train), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(train @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, train)
+        empty = ~sums.any(axis=1)
+        sums[empty] = train[rng.choice(len(train), int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = (sums / np.where(norms == 0, 1, norms)).astype(np.float32)
+    return centroids
+
+
+class IVFRetriever:
+    # Inverted-file index: rows are bucketed by nearest centroid and stored
+    # contiguously per bucket, so a query only scans the n_probe buckets
+    # closest to it. n_probe trades recall for latency and can be changed
+    # without rebuilding.
+    exact = False
+
+    def __init__(self, features, n_lists=None, n_probe=IVF_N_PROBE, iterations=IVF_TRAIN_ITERATIONS, seed=0):
+        self.features = features
+        self.n_lists = min(len(features), n_lists or max(1, int(math.sqrt(len(features)))))
+        self.n_probe = n_probe
+        self.centroids = spherical_kmeans(features, self.n_lists, iterations=iterations, seed=seed)
+
+        self.assignments = np.empty(len(features), dtype=np.intp)
+        for start in range(0, len(features), 65536):
+            block = features[start:start + 65536] @ self.centroids.T
+            self.assignments[start:start + 65536] = np.argmax(block, axis=1)
+        self.order = np.argsort(self.assignments, kind="stable")
+        self.offsets = np.searchsorted(self.assignments[self.order], np.arange(self.n_lists + 1))
+        self.list_features = np.ascontiguousarray(features[self.order])
+
+    def list_max(self, values):
+        # Per-list maximum of a per-row array, -inf for empty lists. NaN
+        # rows (unrated fragrances) are skipped, otherwise one of them would
+        # make its whole list rank last and never be probed.
+        result = np.full(self.n_lists, -np.inf)
+        sizes = np.diff(self.offsets)
+        nonempty = np.flatnonzero(sizes)
+        result[nonempty] = np.fmax.reduceat(values[self.order], self.offsets[nonempty])
+        return result
+
+    def _probe(self, query, centroid_sims, sim_weight=1.0, list_bonus=None, extra_rows=None, mask=None):
+        # Lists are ranked by an estimate of the best final score they can
+        # hold: weighted centroid similarity plus the list's best
+        # similarity-independent score, so well-rated clusters slightly
+        # further away still get probed when similarity carries little weight.
+        list_scores = sim_weight * centroid_sims
+        if list_bonus is not None:
+            list_scores = list_scores + list_bonus
+        n_probe = min(self.n_probe, self.n_lists)
+        if mask is not None and np.count_nonzero(mask) * self.n_lists <= n_probe * len(self.features):
+            # A filter this selective leaves fewer rows than a probe would
+            # scan, so scoring the allowed rows directly is cheaper and exact.
+            rows = np.flatnonzero(mask)
+            return rows, self.features[rows] @ query
+        lists = np.argpartition(-list_scores, n_probe - 1)[:n_probe]
+        rows, sims = [], []
+        for i in lists:
+            list_rows = self.order[self.offsets[i]:self.offsets[i + 1]]
+            list_features = self.list_features[self.offsets[i]:self.offsets[i + 1]]
+            if mask is not None:
+                keep = mask[list_rows]
+                list_rows, list_features = list_rows[keep], list_features[keep]
+            rows.append(list_rows)
+            sims.append(list_features @ query)
+        if extra_rows is not None and len(extra_rows):
+            extra_rows = extra_rows[~np.isin(self.assignments[extra_rows], lists)]
+            if mask is not None:
+                extra_rows = extra_rows[mask[extra_rows]]
+            rows.append(extra_rows)
+            sims.append(self.features[extra_rows] @ query)
+        rows = np.concatenate(rows)
+        sims = np.concatenate(sims)
+        # Row order keeps tie-breaks consistent with the exact scan.
+        ordering = np.argsort(rows, kind="stable")
+        return rows[ordering], sims[ordering]
+
+    def search(self, query, **hints):
+        return self._probe(query, self.centroids @ query, **hints)
+
+    def search_batch(self, queries, hints=None, chunk_size=256):
+        for start in range(0, len(queries), chunk_size):
+            chunk = queries[start:start + chunk_size]
+            for offset, centroid_sims in enumerate(chunk @ self.centroids.T):
+                yield self._probe(chunk[offset], centroid_sims, **(hints[start + offset] if hints else {}))
+
+
+def build_retriever(features, backend=RETRIEVAL_BACKEND, min_rows=ANN_MIN_ROWS, **options):
+    if backend == "auto":
+        backend = "ivf" if len(features) >= min_rows else "exact"
+    if backend == "exact":
+        return ExactRetriever(features)
+    if backend == "ivf":
+        return IVFRetriever(features, n_lists=options.pop("n_lists", IVF_N_LISTS or None), **options)
+    raise ValueError(f"Unknown retrieval backend: {backend}")
@@ -0,0 +1,83 @@
+import numpy as np
+from app.model.schemas import TimePreference, SeasonPreference
+
+
+RATING_PRIOR_COUNT = 10
+RATING_PRIOR_MEAN = 3.0
+
+SIMILARITY_WEIGHT = 0.35
+RATING_WEIGHT = 0.20
+PRICE_WEIGHT = 0.15
+TIME_WEIGHT = 0.15
+SEASON_WEIGHT = 0.15
+
+
+def l2_normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
+def top_k_indices(scores, k):
+    # argpartition is O(N); only the k survivors get fully sorted. NaN scores
+    # sort last, matching the previous sort_values(ascending=False) behaviour.
+    k = min(k, scores.shape[0])
+    if k < scores.shape[0]:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(scores.shape[0])
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+def min_max_normalize(values):
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    return (values - lo) / (hi - lo + 1e-9)
+
+
+class ScoringEngine:
+    def __init__(self, catalog):
+        rating_value = np.asarray(catalog["ratingValue"], dtype=np.float64)
+        rating_count = np.asarray(catalog["ratingCount"], dtype=np.float64)
+        rating_score = (
+            (rating_value * rating_count + RATING_PRIOR_MEAN * RATING_PRIOR_COUNT)
+            / (rating_count + RATING_PRIOR_COUNT)
+        )
+        price_score = np.asarray(catalog["priceValue_score"], dtype=np.float64)
+        time_score = np.asarray(catalog["timeOfDay_score"], dtype=np.float64)
+        season_score = np.asarray(catalog["season_score"], dtype=np.float64)
+
+        self.size = len(catalog)
+        self.rating_component = np.ascontiguousarray(RATING_WEIGHT * min_max_normalize(rating_score))
+        self.price_component = np.ascontiguousarray(PRICE_WEIGHT * min_max_normalize(price_score))
+
+        self.time_components = {
+            TimePreference.both: np.full(self.size, TIME_WEIGHT * 1.0),
+            TimePreference.day: np.ascontiguousarray(TIME_WEIGHT * ((time_score + 2) / 4)),
+            TimePreference.night: np.ascontiguousarray(TIME_WEIGHT * ((-time_score + 2) / 4)),
+        }
+        self.season_components = {
+            SeasonPreference.both: np.full(self.size, SEASON_WEIGHT * 1.0),
+            SeasonPreference.hot: np.ascontiguousarray(SEASON_WEIGHT * ((season_score + 2) / 4)),
+            SeasonPreference.cold: np.ascontiguousarray(SEASON_WEIGHT * ((-season_score + 2) / 4)),
+        }
+        self._priors = {}
+
+    def final_scores(self, sims, time_pref, season_pref, diversity_factor=0.0, rows=None):
+        # Summed in the same order as the original row-wise formula so the
+        # resulting scores (and therefore tie-breaks) are bit-for-bit identical.
+        # With rows, sims only cover that subset of the catalog.
+        select = slice(None) if rows is None else rows
+        scores = (SIMILARITY_WEIGHT * (1 - diversity_factor)) * np.asarray(sims, dtype=np.float64)
+        scores += self.rating_component[select]
+        scores += self.price_component[select]
+        scores += self.time_components[TimePreference(time_pref)][select]
+        scores += self.season_components[SeasonPreference(season_pref)][select]
+        return scores
+
+    def prior_scores(self, time_pref, season_pref):
+        # The similarity-independent part of the final score.
+        key = (TimePreference(time_pref), SeasonPreference(season_pref))
+        if key not in self._priors:
+            self._priors[key] = self.final_scores(np.zeros(self.size), *key)
+        return self._priors[key]
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from pathlib import Path
+
+from app.config import NEIGHBOUR_TABLE_FILE, DATA_FILE, DATASET_WATCH_INTERVAL
+from app.service.catalog import Catalog, dataset_version
+from app.service.recommender import FragranceRecommender
+
+
+def resolve_source(source):
+    # A source is a CSV file, a catalog artifact directory (has a
+    # manifest.json) or a drop directory of CSVs, of which the newest wins.
+    # Returns the path that actually holds the data, or None if there is none.
+    source = Path(source)
+    if not source.is_dir():
+        return source if source.exists() else None
+    if (source / "manifest.json").exists():
+        return source
+    csvs = sorted(source.glob("*.csv"), key=lambda p: (p.stat().st_mtime_ns, p.name))
+    return csvs[-1] if csvs else None
+
+
+def source_version(source=None):
+    # The dataset version the source would load as, without building it.
+    path = resolve_source(source if source is not None else DATA_FILE)
+    if path is None:
+        raise FileNotFoundError(f"No dataset found at {source}")
+    if path.is_dir():
+        manifest = Catalog.read_manifest(path)
+        if manifest is None:
+            raise ValueError(f"{path} is not a compatible catalog artifact")
+        return manifest["version"]
+    return dataset_version(path)
+
+
+def source_signature(source):
+    path = resolve_source(source)
+    if path is None:
+        return None
+    stat = (path / "manifest.json").stat() if path.is_dir() else path.stat()
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+def load_recommender(source=None):
+    if source is None:
+        return FragranceRecommender(Catalog.open())
+    path = resolve_source(source)
+    if path is None:
+        raise FileNotFoundError(f"No dataset found at {source}")
+    if path.is_dir():
+        # An artifact directory may ship its own neighbour table; otherwise
+        # the default one is used if it was built for the same version.
+        neighbours = path / "neighbours.npz"
+        return FragranceRecommender(
+            Catalog.load(path), neighbour_table=neighbours if neighbours.exists() else NEIGHBOUR_TABLE_FILE
+        )
+    return FragranceRecommender(Catalog.from_csv(path))
+
+
+class DatasetSnapshot:
+    # Everything derived from one dataset version, built once and never
+    # mutated afterwards. Request handlers read the manager's current
+    # snapshot once and use only that object, so a swap never mixes two
+    # versions within one request and in-flight requests finish on the
+    # snapshot they started with.
+    def __init__(self, recommender):
+        self.recommender = recommender
+        self.version = recommender.dataset_version
+        self.source = recommender.catalog.source
+        self.rows = len(recommender.catalog)
+        self.loaded_at = time.time()
+
+    @classmethod
+    def load(cls, source=None):
+        return cls(load_recommender(source))
+
+    def info(self):
+        return {"version": self.version, "rows": self.rows, "loaded_at": self.loaded_at}
+
+
+class SnapshotManager:
+    def __init__(self, load=DatasetSnapshot.load, snapshot=None):
+        self.load = load
+        self.current = snapshot or load()
+        self.listeners = []
+        self.reloads = 0
+        self.reload_errors = 0
+        self._lock = asyncio.Lock()
+
+    def on_swap(self, listener):
+        self.listeners.append(listener)
+        return listener
+
+    def swap(self, snapshot):
+        # Runs on the event loop, so no handler observes the new snapshot
+        # before every listener has been moved over to it.
+        previous = self.current
+        self.current = snapshot
+        self.reloads += 1
+        for listener in self.listeners:
+            listener(snapshot)
+        return previous
+
+    async def reload(self, source=None, force=False):
+        # Builds the new snapshot in a thread while the current one keeps
+        # serving; returns it, or None when the source holds the version
+        # that is already live.
+        async with self._lock:
+            if not force and await asyncio.to_thread(source_version, source) == self.current.version:
+                return None
+            snapshot = await asyncio.to_thread(self.load, source)
+            self.swap(snapshot)
+            return snapshot
+
+    async def watch(self, source, interval=DATASET_WATCH_INTERVAL):
+        # Polls instead of relying on filesystem events so it behaves the
+        # same on every platform and on network mounts. A change is only
+        # loaded once it looked the same on two polls in a row, so a file
+        # that is still being copied is never read half-written.
+        seen = candidate = None
+        while True:
+            await asyncio.sleep(interval)
+            signature = source_signature(source)
+            if signature is None or signature == seen:
+                candidate = None
+                continue
+            if signature != candidate:
+                candidate = signature
+                continue
+            seen, candidate = signature, None
+            try:
+                if await self.reload(source):
+                    print(f"Dataset reloaded from {source} (version {self.current.version})")
+            except Exception as e:
+                self.reload_errors += 1
+                print(f"Dataset reload from {source} failed: {e}")
+
+    def info(self):
+        return {**self.current.info(), "reloads": self.reloads, "reload_errors": self.reload_errors}
@@ -0,0 +1,43 @@
+import time
+from contextvars import ContextVar
+
+
+_current = ContextVar("request_timings", default=None)
+
+
+class Timings:
+    # Per-request stage durations in milliseconds, accumulated by name so a
+    # stage that runs several times (batch ranking, two rate limits) is
+    # reported once. Code paths call current_timings() and skip all timing
+    # work when it returns None, which is the case unless the timing
+    # middleware is installed.
+    __slots__ = ("durations", "_last")
+
+    def __init__(self):
+        self.durations = {}
+        self._last = time.perf_counter()
+
+    def mark(self):
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        # Adds the time since the previous mark/lap to `name`.
+        now = time.perf_counter()
+        self.durations[name] = self.durations.get(name, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def add(self, name, ms):
+        self.durations[name] = self.durations.get(name, 0.0) + ms
+
+
+def current_timings():
+    return _current.get()
+
+
+def start_timings():
+    timings = Timings()
+    return timings, _current.set(timings)
+
+
+def stop_timings(token):
+    _current.reset(token)
@@ -0,0 +1,71 @@
+import argparse
+import time
+
+import numpy as np
+
+from app.model.schemas import TimePreference, SeasonPreference
+from app.service.catalog import Catalog
+from app.service.recommender import FragranceRecommender
+from app.service.retrieval import ExactRetriever, IVFRetriever
+from benchmarks.synthetic import make_synthetic_catalog
+
+
+def make_queries(recommender, n_queries, seed):
+    rng = np.random.default_rng(seed)
+    times, seasons = list(TimePreference), list(SeasonPreference)
+    queries = []
+    for _ in range(n_queries):
+        rows = rng.integers(0, len(recommender.catalog), rng.integers(1, 4))
+        queries.append((
+            recommender.catalog.feature_values(rows).mean(axis=0),
+            times[rng.integers(len(times))],
+            seasons[rng.integers(len(seasons))],
+        ))
+    return queries
+
+
+def run(recommender, queries, top_k, diversity_factor):
+    results, latencies = [], []
+    for vector, time_pref, season_pref in queries:
+        start = time.perf_counter()
+        recs = recommender.get_recommendations(vector, time_pref, season_pref, top_k, diversity_factor)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append({r.name for r in recs})
+    return results, np.percentile(latencies, [50, 95])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF retrieval recall@k and latency against the exact scan")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--n-lists", type=int, default=0, help="0 = sqrt(rows)")
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--diversity", type=float, nargs="+", default=[0.0, 0.5])
+    args = parser.parse_args()
+
+    for n_rows in args.sizes:
+        catalog = Catalog.from_dataframe(make_synthetic_catalog(n_rows), version="synthetic")
+        recommender = FragranceRecommender(catalog, retriever=ExactRetriever(catalog.features))
+        queries = make_queries(recommender, args.queries, seed=n_rows)
+
+        start = time.perf_counter()
+        ivf = IVFRetriever(catalog.features, n_lists=args.n_lists or None)
+        build_s = time.perf_counter() - start
+        print(f"\n{n_rows} rows: {ivf.n_lists} lists, index built in {build_s:.2f}s")
+        print(f"{'diversity':>9} {'backend':>12} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8}")
+
+        for diversity in args.diversity:
+            recommender.retriever = ExactRetriever(catalog.features)
+            exact, (p50, p95) = run(recommender, queries, args.top_k, diversity)
+            print(f"{diversity:>9.2f} {'exact':>12} {1.0:>9.3f} {p50:>8.2f} {p95:>8.2f}")
+            recommender.retriever = ivf
+            for n_probe in args.n_probe:
+                ivf.n_probe = n_probe
+                approx, (p50, p95) = run(recommender, queries, args.top_k, diversity)
+                recall = np.mean([len(a & e) / len(e) for a, e in zip(approx, exact)])
+                print(f"{diversity:>9.2f} {f'ivf/{n_probe}':>12} {recall:>9.3f} {p50:>8.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import timeit
+
+from sklearn.metrics.pairwise import cosine_similarity
+
+from app.config import NUMERIC_FEATURE_COLS
+from app.service.scoring import ScoringEngine, l2_normalize, top_k_indices
+from app.model.schemas import TimePreference, SeasonPreference
+from benchmarks.synthetic import make_synthetic_catalog
+
+
+def legacy_candidates(df, engine, user_vector, pool_size):
+    sims = cosine_similarity(user_vector.reshape(1, -1), df[NUMERIC_FEATURE_COLS].values)[0]
+    temp = df.copy()
+    temp["final_score"] = engine.final_scores(sims, TimePreference.both, SeasonPreference.both)
+    return temp.sort_values("final_score", ascending=False).head(pool_size).index.to_numpy()
+
+
+def current_candidates(feature_matrix, engine, user_vector, pool_size):
+    sims = feature_matrix @ l2_normalize(user_vector)
+    final_scores = engine.final_scores(sims, TimePreference.both, SeasonPreference.both)
+    return top_k_indices(final_scores, pool_size)
+
+
+def best_ms(fn, repeat):
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Similarity + candidate pool selection benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4_000, 100_000, 1_000_000])
+    parser.add_argument("--pool-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy ms':>12} {'current ms':>12} {'speedup':>9} {'pool overlap':>13}")
+    for n_rows in args.sizes:
+        df = make_synthetic_catalog(n_rows)
+        engine = ScoringEngine(df)
+        feature_matrix = l2_normalize(df[NUMERIC_FEATURE_COLS].to_numpy())
+        user_vector = df[NUMERIC_FEATURE_COLS].iloc[:3].mean(axis=0).to_numpy()
+
+        legacy = best_ms(lambda: legacy_candidates(df, engine, user_vector, args.pool_size), args.repeat)
+        current = best_ms(lambda: current_candidates(feature_matrix, engine, user_vector, args.pool_size), args.repeat)
+        overlap = len(
+            set(legacy_candidates(df, engine, user_vector, args.pool_size))
+            & set(current_candidates(feature_matrix, engine, user_vector, args.pool_size))
+        ) / args.pool_size
+        print(f"{n_rows:>10} {legacy:>12.2f} {current:>12.2f} {legacy / current:>8.1f}x {overlap:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
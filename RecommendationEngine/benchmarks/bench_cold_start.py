@@ -0,0 +1,51 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from app.config import BASE_DIR, CATALOG_DIR
+
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+from app.service.recommender import FragranceRecommender
+imported = time.perf_counter()
+recommender = FragranceRecommender()
+recommender.build_user_profile([recommender.names[0]])
+done = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "load_ms": (done - imported) * 1000}))
+"""
+
+
+def run_child(catalog_dir):
+    env = dict(os.environ, CATALOG_DIR=str(catalog_dir))
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BASE_DIR, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start comparison: CSV vs binary catalog artifact")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    if not (CATALOG_DIR / "manifest.json").exists():
+        sys.exit(f"No catalog artifact at {CATALOG_DIR}; run `python -m app.offline.catalog` first")
+
+    with tempfile.TemporaryDirectory() as missing:
+        modes = {"csv": os.path.join(missing, "catalog"), "artifact": CATALOG_DIR}
+        print(f"{'source':>10} {'import ms':>10} {'load ms p50':>12} {'load ms min':>12}")
+        for label, catalog_dir in modes.items():
+            samples = [run_child(catalog_dir) for _ in range(args.runs)]
+            loads = [s["load_ms"] for s in samples]
+            imports = statistics.median(s["import_ms"] for s in samples)
+            print(f"{label:>10} {imports:>10.1f} {statistics.median(loads):>12.2f} {min(loads):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
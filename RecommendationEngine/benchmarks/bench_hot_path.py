@@ -0,0 +1,181 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.config import ACCORD_COLS
+from app.model.schemas import TimePreference, SeasonPreference
+from app.service.catalog import Catalog
+from app.service.recommender import FragranceRecommender
+from app.service.retrieval import build_retriever
+from benchmarks.synthetic import make_synthetic_catalog
+
+
+METRICS = ["p50_ms", "p95_ms", "p99_ms"]
+# p99 over a few hundred sub-millisecond samples is too noisy to gate on.
+GATED_METRICS = ["p50_ms", "p95_ms"]
+
+
+def load_catalog(size):
+    if size == "real":
+        return Catalog.open()
+    n_rows = int(size)
+    return Catalog.from_dataframe(make_synthetic_catalog(n_rows), version=f"synthetic-{n_rows}")
+
+
+def make_inputs(recommender, n, seed=0):
+    rng = np.random.default_rng(seed)
+    names = recommender.names
+    times, seasons = list(TimePreference), list(SeasonPreference)
+    inputs = []
+    for _ in range(n):
+        liked = [names[i] for i in rng.integers(0, len(names), rng.integers(1, 4))]
+        accords = {a: round(float(rng.uniform(0.2, 1.0)), 2) for a in rng.choice(ACCORD_COLS, 3, replace=False)}
+        inputs.append({
+            "liked": liked,
+            "vector": recommender.build_user_profile(liked),
+            "accords": accords,
+            "time": times[rng.integers(len(times))],
+            "season": seasons[rng.integers(len(seasons))],
+        })
+    return inputs
+
+
+def make_cases(recommender, top_k):
+    pool = recommender.feature_matrix[:max(30, top_k * 10)]
+    relevance = np.linspace(1.0, 0.5, len(pool))
+    return {
+        "build_user_profile": lambda x: recommender.build_user_profile(x["liked"]),
+        "get_recommendations": lambda x: recommender.get_recommendations(
+            x["vector"], x["time"], x["season"], top_k, 0.0
+        ),
+        "get_recommendations_diverse": lambda x: recommender.get_recommendations(
+            x["vector"], x["time"], x["season"], top_k, 0.5
+        ),
+        "mmr_re_rank": lambda x: recommender.mmr_re_rank(pool, relevance, top_k, 0.5),
+        "get_recommendations_by_accords": lambda x: recommender.get_recommendations_by_accords(
+            x["accords"], x["time"], x["season"], top_k, 0.3
+        ),
+    }
+
+
+def percentiles(samples_ms):
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+
+
+def peak_kib(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def time_case(fn, inputs, iterations, warmup):
+    for x in inputs[:warmup]:
+        fn(x)
+    samples = []
+    for i in range(iterations):
+        x = inputs[i % len(inputs)]
+        start = time.perf_counter()
+        fn(x)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {**percentiles(samples), "peak_kib": peak_kib(lambda: fn(inputs[0]))}
+
+
+def time_construction(catalog, backend, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        FragranceRecommender(catalog, retriever=build_retriever(catalog.features, backend=backend))
+        samples.append((time.perf_counter() - start) * 1000)
+    result = percentiles(samples)
+    result["peak_kib"] = peak_kib(
+        lambda: FragranceRecommender(catalog, retriever=build_retriever(catalog.features, backend=backend))
+    )
+    return result
+
+
+def run_catalog(size, args):
+    catalog = load_catalog(size)
+    recommender = FragranceRecommender(catalog, retriever=build_retriever(catalog.features, backend=args.backend))
+    inputs = make_inputs(recommender, args.inputs)
+    results = {"construction": time_construction(catalog, args.backend, args.construction_repeat)}
+    for name, fn in make_cases(recommender, args.top_k).items():
+        if not args.cases or name in args.cases:
+            results[name] = time_case(fn, inputs, args.iterations, args.warmup)
+    return {
+        "rows": len(catalog),
+        "retriever": "exact" if recommender.retriever.exact else "ivf",
+        "cases": results,
+    }
+
+
+def print_report(report):
+    for size, entry in report["catalogs"].items():
+        print(f"\n{size} ({entry['rows']} rows, {entry['retriever']} retrieval)")
+        print(f"{'case':<32} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>10}")
+        for name, r in entry["cases"].items():
+            print(f"{name:<32} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['peak_kib']:>10.1f}")
+
+
+def compare(report, baseline, threshold):
+    # A case regresses when its p50 or p95 is more than `threshold` slower
+    # than the baseline; returns the number of regressions found.
+    regressions = 0
+    print(f"\nchange vs baseline (regression threshold {threshold:.0%}):")
+    for size, entry in report["catalogs"].items():
+        base_entry = baseline.get("catalogs", {}).get(size)
+        if base_entry is None:
+            continue
+        for name, r in entry["cases"].items():
+            base = base_entry["cases"].get(name)
+            if base is None:
+                continue
+            deltas = {m: r[m] / base[m] - 1 for m in METRICS if base[m] > 0}
+            regressed = any(deltas.get(m, 0) > threshold for m in GATED_METRICS)
+            regressions += regressed
+            cells = " ".join(f"{m[:3]} {d:+7.1%}" for m, d in deltas.items())
+            print(f"{'REGRESSION ' if regressed else '':>11}{size:>8} {name:<32} {cells}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency/memory benchmarks for the recommender hot path")
+    parser.add_argument("--sizes", nargs="+", default=["real", "10000", "100000", "1000000"],
+                        help="'real' for data/fragrances.csv or a synthetic row count")
+    parser.add_argument("--cases", nargs="+", help="only run these cases (construction always runs)")
+    parser.add_argument("--backend", default="auto", choices=["auto", "exact", "ivf"])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--inputs", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--construction-repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the report as JSON (use as a later --baseline)")
+    parser.add_argument("--baseline", help="compare against a report written with --output")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    report = {"backend": args.backend, "top_k": args.top_k, "catalogs": {}}
+    for size in args.sizes:
+        report["catalogs"][size] = run_catalog(size, args)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
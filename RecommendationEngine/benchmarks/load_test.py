@@ -0,0 +1,209 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import httpx
+import numpy as np
+
+
+TIME_PREFS = ["day", "night", "both"]
+SEASON_PREFS = ["hot", "cold", "both"]
+
+# Share of traffic per endpoint, roughly what the frontend produces: list
+# endpoints once per page load, autocomplete while typing, then a request.
+DEFAULT_MIX = {
+    "GET /fragrances": 0.04,
+    "GET /accords": 0.04,
+    "GET /fragrances/search": 0.30,
+    "POST /recommend-by-fragrances": 0.40,
+    "POST /recommend-by-accords": 0.18,
+    "POST /recommend-batch": 0.04,
+}
+
+
+class RequestMix:
+    # Seeds are drawn from a Zipf-like popularity curve so the result cache
+    # sees the repeated requests a real audience produces.
+    def __init__(self, fragrances, accords, mix, seed):
+        self.names = [name for _, name in fragrances]
+        self.accords = accords
+        self.endpoints = list(mix)
+        weights = np.array([mix[e] for e in self.endpoints], dtype=np.float64)
+        self.endpoint_p = weights / weights.sum()
+        self.rng = np.random.default_rng(seed)
+        popularity = 1.0 / np.arange(1, len(self.names) + 1) ** 1.1
+        self.name_p = popularity / popularity.sum()
+        self.rng.shuffle(self.names)
+
+    def _names(self, n):
+        return [self.names[i] for i in self.rng.choice(len(self.names), n, p=self.name_p)]
+
+    def _preferences(self):
+        return {
+            "time_pref": str(self.rng.choice(TIME_PREFS)),
+            "season_pref": str(self.rng.choice(SEASON_PREFS)),
+            "diversity_factor": float(self.rng.choice([0.0, 0.0, 0.3, 0.5])),
+            "top_k": int(self.rng.choice([5, 5, 10])),
+        }
+
+    def _profile(self):
+        return {"liked_fragrances": self._names(int(self.rng.integers(1, 4))), **self._preferences()}
+
+    def next(self):
+        endpoint = self.endpoints[self.rng.choice(len(self.endpoints), p=self.endpoint_p)]
+        method, path = endpoint.split(" ")
+        kwargs = {}
+        if path in ("/fragrances", "/accords"):
+            kwargs["headers"] = {"Accept-Encoding": "gzip"}
+        elif path == "/fragrances/search":
+            name = self._names(1)[0]
+            kwargs["params"] = {
+                "q": name[:int(self.rng.integers(2, 7))],
+                "fuzzy": bool(self.rng.random() < 0.2),
+            }
+        elif path == "/recommend-by-fragrances":
+            kwargs["json"] = self._profile()
+        elif path == "/recommend-by-accords":
+            chosen = self.rng.choice(self.accords, int(self.rng.integers(1, 4)), replace=False)
+            kwargs["json"] = {
+                "accord_preferences": {str(a): round(float(self.rng.uniform(0.1, 1.0)), 1) for a in chosen},
+                **self._preferences(),
+            }
+        elif path == "/recommend-batch":
+            kwargs["json"] = {"profiles": [self._profile() for _ in range(10)]}
+        return endpoint, method, path, kwargs
+
+
+def start_fake_redis():
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"redis://{host}:{port}/0"
+
+
+@asynccontextmanager
+async def in_process_client():
+    # Imported here so RATE_LIMIT_SCALE / REDIS_URL set by main() are seen
+    # when app.config is first loaded.
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            yield client
+
+
+async def worker(client, mix, deadline, results):
+    while time.perf_counter() < deadline:
+        endpoint, method, path, kwargs = mix.next()
+        start = time.perf_counter()
+        try:
+            status = (await client.request(method, path, **kwargs)).status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        results[endpoint].append(((time.perf_counter() - start) * 1000, status))
+
+
+async def run(client, args):
+    fragrances = (await client.get("/fragrances")).json()["fragrances"]
+    accords = (await client.get("/accords")).json()["accords"]
+
+    async def phase(seconds, seed):
+        results = defaultdict(list)
+        deadline = time.perf_counter() + seconds
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            worker(client, RequestMix(fragrances, accords, args.mix, seed + i), deadline, results)
+            for i in range(args.concurrency)
+        ))
+        return results, time.perf_counter() - started
+
+    if args.warmup > 0:
+        await phase(args.warmup, args.seed + 10_000)
+    return await phase(args.duration, args.seed)
+
+
+def summarize(results, elapsed):
+    report = {}
+    for endpoint, samples in sorted(results.items()) + [("TOTAL", [s for v in results.values() for s in v])]:
+        latencies = np.array([ms for ms, _ in samples])
+        statuses = defaultdict(int)
+        for _, status in samples:
+            statuses[str(status)] += 1
+        errors = sum(n for status, n in statuses.items() if not (status.isdigit() and int(status) < 400))
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+        report[endpoint] = {
+            "requests": len(samples),
+            "throughput_rps": len(samples) / elapsed,
+            "error_rate": errors / len(samples) if samples else 0.0,
+            "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+            "max_ms": float(latencies.max()) if len(latencies) else 0.0,
+            "statuses": dict(statuses),
+        }
+    return report
+
+
+def print_report(report, elapsed, concurrency):
+    print(f"\n{concurrency} clients for {elapsed:.1f}s")
+    print(f"{'endpoint':<32} {'reqs':>7} {'req/s':>8} {'err %':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for endpoint, r in report.items():
+        print(
+            f"{endpoint:<32} {r['requests']:>7} {r['throughput_rps']:>8.1f} {r['error_rate'] * 100:>6.2f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f}"
+        )
+    failing = {e: r["statuses"] for e, r in report.items() if r["error_rate"] and e != "TOTAL"}
+    for endpoint, statuses in failing.items():
+        print(f"  {endpoint}: {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent async load test for the FastAPI app")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before measuring")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix", type=json.loads, default=DEFAULT_MIX,
+                        help='endpoint weights as JSON, e.g. \'{"POST /recommend-by-fragrances": 1}\'')
+    parser.add_argument("--url", help="load an already running server instead of app.main in-process")
+    parser.add_argument("--redis-url", help="Redis for the in-process app (default: a local fakeredis server)")
+    parser.add_argument("--rate-limit-scale", type=float, default=1e6,
+                        help="multiplier for every route's rate limit in the in-process app")
+    parser.add_argument("--output", help="write the per-endpoint report as JSON")
+    args = parser.parse_args()
+
+    fake_server = None
+    if args.url:
+        client_cm = httpx.AsyncClient(base_url=args.url, timeout=30.0)
+    else:
+        if not args.redis_url:
+            fake_server, args.redis_url = start_fake_redis()
+        os.environ["REDIS_URL"] = args.redis_url
+        os.environ["RATE_LIMIT_SCALE"] = str(args.rate_limit_scale)
+        client_cm = in_process_client()
+
+    async def go():
+        async with client_cm as client:
+            return await run(client, args)
+
+    try:
+        results, elapsed = asyncio.run(go())
+    finally:
+        if fake_server is not None:
+            fake_server.shutdown()
+
+    report = summarize(results, elapsed)
+    print_report(report, elapsed, args.concurrency)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"concurrency": args.concurrency, "duration_s": elapsed, "endpoints": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from app.config import BASE_DIR
+
+
+HEAVY_MODULES = ["pandas", "sklearn", "scipy", "matplotlib"]
+
+FIRST_RESPONSE_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    ready = time.perf_counter()
+    status = client.get("/accords").status_code
+    answered = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_response_ms": (answered - ready) * 1000,
+    "time_to_first_response_ms": (answered - start) * 1000,
+    "status": status,
+    "heavy_modules": [m for m in %r if m in sys.modules],
+}))
+""" % HEAVY_MODULES
+
+
+def run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=BASE_DIR, env=dict(os.environ), capture_output=True, text=True
+    )
+
+
+def import_times(module="app.main"):
+    result = run_python("-X", "importtime", "-c", f"import {module}")
+    modules, packages = {}, defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        modules[name] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+        packages[name.split(".")[0]] += int(self_us) / 1000
+    return modules, dict(packages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time and time-to-first-response report for app.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--baseline", help="compare against a report written with --output")
+    args = parser.parse_args()
+
+    modules, packages = import_times()
+    total = modules.get("app.main", (0, 0))[1]
+    print(f"import app.main: {total:.1f} ms\n")
+    print(f"{'package':<28} {'self ms':>9}")
+    for name, ms in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{name:<28} {ms:>9.1f}")
+    print(f"\n{'module':<40} {'cumulative ms':>14}")
+    for name, (_, cumulative) in sorted(modules.items(), key=lambda kv: -kv[1][1])[:args.top]:
+        print(f"{name:<40} {cumulative:>14.1f}")
+
+    report = {"import_app_main_ms": total, "packages_ms": packages}
+    result = run_python("-c", FIRST_RESPONSE_CHILD)
+    if result.returncode == 0:
+        first = json.loads(result.stdout.strip().splitlines()[-1])
+        report.update(first)
+        print(
+            f"\nlifespan startup: {first['startup_ms']:.1f} ms, first GET /accords: "
+            f"{first['first_response_ms']:.1f} ms (HTTP {first['status']}), "
+            f"process start to first response: {first['time_to_first_response_ms']:.1f} ms"
+        )
+        if first["heavy_modules"]:
+            print(f"WARNING: heavy modules loaded on the serving path: {', '.join(first['heavy_modules'])}")
+    else:
+        print("\ntime to first response skipped (is REDIS_URL reachable?):")
+        print(result.stderr.strip().splitlines()[-1] if result.stderr else "no output")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print("\nchange vs baseline:")
+        for key in ["import_app_main_ms", "startup_ms", "time_to_first_response_ms"]:
+            if key in baseline and key in report:
+                delta = report[key] - baseline[key]
+                print(f"  {key:<28} {report[key]:>9.1f} ms ({delta:+.1f} ms)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import json
 import pytest
 
 def test_root_endpoint(client):
@@ -59,3 +60,144 @@ def test_recommend_by_accords_invalid_weight(client):
     res = client.post("/recommend-by-accords", json={"accord_preferences": {"Citrus & Fresh": -0.5}})
     assert res.status_code == 500
     assert "between 0 and 1" in res.json()["detail"]
+
+def test_recommend_batch(client):
+    profiles = [
+        {"liked_fragrances": ["Oudh 36"]},
+        {"liked_fragrances": ["Oudh 36"], "top_k": 2, "time_pref": "night"},
+    ]
+    res = client.post("/recommend-batch", json={"profiles": profiles})
+    assert res.status_code == 200
+    results = res.json()
+    assert [r["index"] for r in results] == [0, 1]
+    assert len(results[0]["recommendations"]) == 5
+    assert len(results[1]["recommendations"]) == 2
+
+def test_recommend_batch_stream(client):
+    profiles = [{"liked_fragrances": ["Oudh 36"], "top_k": 3}] * 3
+    res = client.post("/recommend-batch", json={"profiles": profiles, "stream": True})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in res.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert all(len(line["recommendations"]) == 3 for line in lines)
+
+def test_recommend_batch_invalid(client):
+    profiles = [{"liked_fragrances": ["Oudh 36"]}, {"liked_fragrances": ["Unknown Fragrance"]}]
+    res = client.post("/recommend-batch", json={"profiles": profiles})
+    assert res.status_code == 500
+    assert "Invalid fragrance names: Unknown Fragrance" in res.json()["detail"]
+
+def test_recommend_by_fragrances_cached(client):
+    from app.api.controller import result_cache
+    body = {"liked_fragrances": ["Oudh 36"], "top_k": 4}
+    first = client.post("/recommend-by-fragrances", json=body)
+    hits = result_cache.hits
+    second = client.post("/recommend-by-fragrances", json=body)
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert result_cache.hits == hits + 1
+
+def test_search_fragrances_endpoint(client):
+    res = client.get("/fragrances/search", params={"q": "oudh 3", "limit": 3})
+    assert res.status_code == 200
+    data = res.json()["fragrances"]
+    assert 0 < len(data) <= 3
+    assert ["Al Haramain Perfumes", "Oudh 36"] in data
+
+def test_search_fragrances_requires_query(client):
+    res = client.get("/fragrances/search")
+    assert res.status_code == 422
+
+def test_list_fragrances_compressed_and_conditional(client):
+    res = client.get("/fragrances", headers={"Accept-Encoding": "gzip"})
+    assert res.status_code == 200
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["vary"] == "Accept-Encoding"
+    assert "max-age" in res.headers["cache-control"]
+    assert res.json()["fragrances"]
+    etag = res.headers["etag"]
+
+    res = client.get("/fragrances", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.headers["etag"] == etag
+    assert res.content == b""
+
+def test_list_accords_identity_matches_gzip_etag(client):
+    gzipped = client.get("/accords", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/accords", headers={"Accept-Encoding": "identity", "If-None-Match": gzipped.headers["etag"]})
+    assert plain.status_code == 304
+    stale = client.get("/accords", headers={"Accept-Encoding": "identity", "If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+    assert "content-encoding" not in stale.headers
+    assert stale.json() == gzipped.json()
+
+def test_recommend_by_fragrances_with_filters(client):
+    body = {"liked_fragrances": ["Oudh 36"], "top_k": 5, "filters": {"genders": ["Unisex"], "min_rating": 4.2}}
+    res = client.post("/recommend-by-fragrances", json=body)
+    assert res.status_code == 200
+    data = res.json()
+    assert len(data) == 5
+    assert all(r["gender_label"] == "Unisex" and r["rating_value"] >= 4.2 for r in data)
+
+@pytest.mark.parametrize("diversity_factor", [0.0, 0.5])
+def test_recommend_by_fragrances_filter_with_unrated_rows(client, diversity_factor):
+    # Armaf has unrated fragrances in the catalog; they must be left out
+    # rather than fail the response.
+    body = {"liked_fragrances": ["Oudh 36"], "top_k": 20, "diversity_factor": diversity_factor,
+            "filters": {"include_brands": ["Armaf"]}}
+    res = client.post("/recommend-by-fragrances", json=body)
+    assert res.status_code == 200
+    data = res.json()
+    assert data
+    assert all(r["brand"].strip() == "Armaf" and r["rating_count"] is not None for r in data)
+
+def test_recommend_by_accords_invalid_filter(client):
+    body = {"accord_preferences": {"Floral": 0.5}, "filters": {"genders": ["Androgynous"]}}
+    res = client.post("/recommend-by-accords", json=body)
+    assert res.status_code == 422
+
+def test_recommend_returns_503_when_saturated(client, monkeypatch):
+    from app.api import controller
+    monkeypatch.setattr(controller.executor, "max_in_flight", 0)
+    res = client.post("/recommend-by-fragrances", json={"liked_fragrances": ["Oudh 36"], "top_k": 13})
+    assert res.status_code == 503
+    assert res.headers["retry-after"] == "1"
+
+def test_recommend_batch_stream_is_shed_when_saturated(client, monkeypatch):
+    from app.api import controller
+    profiles = [{"liked_fragrances": ["Oudh 36"], "top_k": 3}] * 2
+    monkeypatch.setattr(controller.executor, "max_in_flight", 0)
+    res = client.post("/recommend-batch", json={"profiles": profiles, "stream": True})
+    assert res.status_code == 503
+    assert res.headers["retry-after"] == "1"
+
+    monkeypatch.undo()
+    res = client.post("/recommend-batch", json={"profiles": profiles, "stream": True})
+    assert res.status_code == 200
+    assert len(res.text.splitlines()) == 2
+    assert controller.executor.in_flight == 0
+
+def test_dataset_swap_updates_version_etag_and_cache(client, tmp_path):
+    from app.api import controller
+    from app.config import DATA_FILE
+    original = controller.snapshots.current
+    res = client.get("/dataset")
+    assert res.status_code == 200
+    assert res.json()["version"] == original.version
+    assert client.get("/fragrances").headers["etag"].startswith(f'"{original.version}-')
+
+    subset = tmp_path / "fragrances.csv"
+    subset.write_text("".join(DATA_FILE.read_text(encoding="utf-8").splitlines(keepends=True)[:201]), encoding="utf-8")
+    replacement = controller.ServingSnapshot.load(subset)
+    controller.snapshots.swap(replacement)
+    try:
+        assert client.get("/dataset").json()["rows"] == 200
+        listed = client.get("/fragrances")
+        assert listed.headers["etag"].startswith(f'"{replacement.version}-')
+        assert len(listed.json()["fragrances"]) <= 200
+        assert controller.result_cache.version == replacement.version
+        assert controller.executor.recommender is replacement.recommender
+    finally:
+        controller.snapshots.swap(original)
+    assert controller.result_cache.version == original.version
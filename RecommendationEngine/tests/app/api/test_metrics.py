@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.metrics import Histogram, TimingMiddleware, server_timing
+from app.main import app
+from app.service.timing import Timings, current_timings, start_timings, stop_timings
+
+
+@pytest.fixture(scope="module")
+def timed_client():
+    with TestClient(TimingMiddleware(app)) as c:
+        yield c
+
+
+def test_timings_accumulate_by_name():
+    timings = Timings()
+    timings.add("rate_limit", 1.5)
+    timings.add("rate_limit", 0.5)
+    timings.lap("scoring")
+    assert timings.durations["rate_limit"] == 2.0
+    assert timings.durations["scoring"] >= 0.0
+
+
+def test_timings_only_active_inside_a_request():
+    assert current_timings() is None
+    timings, token = start_timings()
+    assert current_timings() is timings
+    stop_timings(token)
+    assert current_timings() is None
+
+
+def test_histogram_render():
+    histogram = Histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0))
+    histogram.observe(("a",), 0.05)
+    histogram.observe(("a",), 0.5)
+    histogram.observe(("a",), 5.0)
+    lines = histogram.render()
+    assert '# TYPE demo_seconds histogram' in lines
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{stage="a"} 3' in lines
+
+
+def test_server_timing_header_format():
+    header = server_timing({"scoring": 1.25, "mmr": 0.5}, 3.0)
+    assert header == "scoring;dur=1.250, mmr;dur=0.500, framework;dur=1.250, total;dur=3.000"
+
+
+def test_server_timing_header_and_metrics(timed_client):
+    res = timed_client.post("/recommend-by-accords", json={"accord_preferences": {"Warm & Spicy": 0.8}, "top_k": 7})
+    assert res.status_code == 200
+    stages = {part.split(";")[0] for part in res.headers["server-timing"].split(", ")}
+    assert {"rate_limit", "retrieval", "scoring", "candidate_sort", "mmr", "build_response", "total"} <= stages
+
+    body = timed_client.get("/metrics").text
+    assert 'request_stage_duration_seconds_count{route="/recommend-by-accords",stage="scoring"}' in body
+    assert 'http_request_duration_seconds_bucket{method="POST",route="/recommend-by-accords",status="200",le="+Inf"}' in body
+    assert "recommendation_cache_misses_total" in body
+
+
+def test_no_server_timing_without_middleware(client):
+    res = client.get("/")
+    assert "server-timing" not in res.headers
@@ -0,0 +1,128 @@
+import asyncio
+
+import fakeredis
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.api.rate_limit import Limit, RateLimiter
+
+
+class CountingRedis(fakeredis.FakeAsyncRedis):
+    calls = 0
+
+    async def evalsha(self, *args, **kwargs):
+        CountingRedis.calls += 1
+        return await super().evalsha(*args, **kwargs)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_request(path="/recommend-by-fragrances", ip="10.0.0.1"):
+    return Request({
+        "type": "http", "method": "POST", "path": path,
+        "headers": [(b"x-forwarded-for", f"{ip}, 172.16.0.1".encode())],
+        "client": ("127.0.0.1", 5000),
+    })
+
+
+@pytest.fixture(autouse=True)
+def production_limits(monkeypatch):
+    # conftest scales limits up for the API tests; these test the limits.
+    monkeypatch.setattr("app.api.rate_limit.RATE_LIMIT_SCALE", 1.0)
+
+
+@pytest.fixture
+def redis_client():
+    CountingRedis.calls = 0
+    return CountingRedis(decode_responses=True)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def status_of(limiter, route_limit, request=None):
+    try:
+        run(limiter.check(request or make_request(), route_limit))
+        return 200
+    except HTTPException as e:
+        return e.status_code, e.headers["Retry-After"]
+
+
+def test_single_round_trip_for_global_and_route_limits(redis_client):
+    limiter = RateLimiter(local_sync_ms=0)
+    run(limiter.init(redis_client))
+    limiter.add_global_limit(100, seconds=60)
+    route = Limit(3, 60)
+    assert [status_of(limiter, route) for _ in range(3)] == [200, 200, 200]
+    assert status_of(limiter, route) == (429, "60")
+    assert CountingRedis.calls == 4
+    keys = sorted(run(redis_client.keys("*")))
+    assert keys == ["rate-limit:10.0.0.1:/recommend-by-fragrances:g0", "rate-limit:10.0.0.1:/recommend-by-fragrances:route"]
+    assert run(redis_client.get(keys[0])) == "4"
+    assert run(redis_client.get(keys[1])) == "3"
+
+
+def test_limits_are_per_client_and_path(redis_client):
+    limiter = RateLimiter(local_sync_ms=0)
+    run(limiter.init(redis_client))
+    route = Limit(1, 60)
+    assert status_of(limiter, route) == 200
+    assert status_of(limiter, route, make_request(ip="10.0.0.2")) == 200
+    assert status_of(limiter, route, make_request(path="/accords")) == 200
+    assert status_of(limiter, route)[0] == 429
+
+
+def test_global_limit_rejects_before_route_counter_moves(redis_client):
+    limiter = RateLimiter(local_sync_ms=0)
+    run(limiter.init(redis_client))
+    limiter.add_global_limit(1, seconds=60)
+    route = Limit(10, 60)
+    assert status_of(limiter, route) == 200
+    assert status_of(limiter, route)[0] == 429
+    assert run(redis_client.get("rate-limit:10.0.0.1:/recommend-by-fragrances:route")) == "1"
+
+
+def test_reloads_flushed_script(redis_client):
+    limiter = RateLimiter(local_sync_ms=0)
+    run(limiter.init(redis_client))
+    run(redis_client.script_flush())
+    assert status_of(limiter, Limit(5, 60)) == 200
+
+
+def test_local_mode_syncs_periodically(redis_client):
+    clock = Clock()
+    limiter = RateLimiter(local_sync_ms=500, clock=clock)
+    run(limiter.init(redis_client))
+    route = Limit(5, 60)
+    key = "rate-limit:10.0.0.1:/recommend-by-fragrances:route"
+
+    assert [status_of(limiter, route) for _ in range(3)] == [200, 200, 200]
+    assert CountingRedis.calls == 1
+    assert run(redis_client.get(key)) == "1"
+
+    clock.now += 0.6
+    assert status_of(limiter, route) == 200
+    assert CountingRedis.calls == 2
+    assert run(redis_client.get(key)) == "4"
+
+    assert status_of(limiter, route) == 200
+    status, retry_after = status_of(limiter, route)
+    assert status == 429 and int(retry_after) <= 60
+    assert CountingRedis.calls == 2
+
+    clock.now += 0.6
+    assert status_of(limiter, route)[0] == 429
+    assert run(redis_client.get(key)) == "5"
+
+
+def test_uninitialised_limiter_fails_loudly():
+    with pytest.raises(RuntimeError):
+        run(RateLimiter().check(make_request(), Limit(1, 60)))
@@ -0,0 +1,53 @@
+import gzip
+import json
+
+from starlette.requests import Request
+
+from app.api.static_responses import PrecomputedJSONResponse, parse_accept_encoding
+
+
+def make_request(headers):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    return Request(scope)
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.5, identity;q=0") == {"gzip": 1.0, "br": 0.5, "identity": 0.0}
+    assert parse_accept_encoding("") == {}
+
+
+def test_body_matches_json_response_rendering():
+    payload = {"accords": ["Citrus & Fresh", "Éther"]}
+    response = PrecomputedJSONResponse(payload, "v1")
+    assert json.loads(response.variants[None]) == payload
+    assert gzip.decompress(response.variants["gzip"]) == response.variants[None]
+    assert "Éther".encode("utf-8") in response.variants[None]
+
+
+def test_encoding_negotiation():
+    response = PrecomputedJSONResponse({"a": 1}, "v1")
+    assert response.choose_encoding("gzip;q=0") is None
+    assert response.choose_encoding("*") in ("br", "gzip")
+    assert response.choose_encoding("deflate") is None
+
+
+def test_etag_changes_with_version():
+    first = PrecomputedJSONResponse({"a": 1}, "v1")
+    second = PrecomputedJSONResponse({"a": 1}, "v2")
+    assert first.etag(None) != second.etag(None)
+    assert first.matches(f'W/{first.etag("gzip")}, "other"')
+    assert not first.matches(second.etag(None))
+
+
+def test_respond_not_modified():
+    response = PrecomputedJSONResponse({"a": 1}, "v1")
+    result = response.respond(make_request({"If-None-Match": "*"}))
+    assert result.status_code == 304
+    result = response.respond(make_request({"Accept-Encoding": "gzip"}))
+    assert result.status_code == 200
+    assert result.headers["content-encoding"] == "gzip"
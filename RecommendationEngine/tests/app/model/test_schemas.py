@@ -1,6 +1,9 @@
 import pytest
 from pydantic import ValidationError
-from app.model.schemas import RecommendationRequest, AccordBasedRecommendationRequest, TimePreference, SeasonPreference
+from app.model.schemas import (
+    RecommendationRequest, AccordBasedRecommendationRequest, BatchRecommendationRequest,
+    TimePreference, SeasonPreference,
+)
 
 def test_recommendation_request_valid():
     req = RecommendationRequest(
@@ -47,3 +50,12 @@ def test_accord_based_request_invalid_empty_preferences():
     # accord_preferences must have at least one item (min_length=1)
     with pytest.raises(ValidationError):
         AccordBasedRecommendationRequest(accord_preferences={}, time_pref=TimePreference.both)
+
+def test_batch_request_limits():
+    req = BatchRecommendationRequest(profiles=[{"liked_fragrances": ["A"]}])
+    assert req.stream is False
+    assert isinstance(req.profiles[0], RecommendationRequest)
+    with pytest.raises(ValidationError):
+        BatchRecommendationRequest(profiles=[])
+    with pytest.raises(ValidationError):
+        BatchRecommendationRequest(profiles=[{"liked_fragrances": ["A"]}] * 501)
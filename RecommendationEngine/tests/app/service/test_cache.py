@@ -0,0 +1,83 @@
+import asyncio
+import fakeredis.aioredis
+from app.service.cache import RecommendationCache
+from app.model.schemas import RecommendationRequest, AccordBasedRecommendationRequest, RecommendationResponse
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_response(name="A"):
+    return RecommendationResponse(
+        name=name, brand="B", rating_value=4.0, rating_count=10, gender_label="Unisex",
+        price_value_label="Fair Price", match_score=0.5, dominant_accords=[("Floral", 0.9)],
+        notes_breakdown=None,
+    )
+
+
+def test_fragrance_key_is_canonical():
+    cache = RecommendationCache()
+    cache.bind_version("v1")
+    a = cache.fragrance_key(RecommendationRequest(liked_fragrances=["B", "A", "A"]))
+    b = cache.fragrance_key(RecommendationRequest(liked_fragrances=["A", "B"]))
+    c = cache.fragrance_key(RecommendationRequest(liked_fragrances=["A", "B"], top_k=6))
+    assert a == b
+    assert a != c
+    assert a.startswith("rec:v1:fragrances:")
+
+
+def test_accord_key_quantizes_weights():
+    cache = RecommendationCache(accord_precision=0.05)
+    a = cache.accord_key(AccordBasedRecommendationRequest(accord_preferences={"Floral": 0.51, "Uncommon": 0.2}))
+    b = cache.accord_key(AccordBasedRecommendationRequest(accord_preferences={"Uncommon": 0.19, "Floral": 0.49}))
+    c = cache.accord_key(AccordBasedRecommendationRequest(accord_preferences={"Floral": 0.6, "Uncommon": 0.2}))
+    assert a == b
+    assert a != c
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = RecommendationCache(max_entries=2, ttl_seconds=10, clock=clock)
+
+    async def scenario():
+        await cache.set("a", [make_response("a")])
+        await cache.set("b", [make_response("b")])
+        assert await cache.get("a") is not None
+        await cache.set("c", [make_response("c")])
+        assert await cache.get("b") is None
+        assert await cache.get("a") is not None
+        clock.now = 11
+        assert await cache.get("a") is None
+
+    asyncio.run(scenario())
+    assert cache.hits == 2
+    assert cache.misses == 2
+
+
+def test_version_change_invalidates():
+    cache = RecommendationCache()
+    cache.bind_version("v1")
+    key = cache.fragrance_key(RecommendationRequest(liked_fragrances=["A"]))
+    asyncio.run(cache.set(key, [make_response()]))
+    cache.bind_version("v2")
+    assert cache.stats()["entries"] == 0
+    assert cache.fragrance_key(RecommendationRequest(liked_fragrances=["A"])) != key
+
+
+def test_redis_tier_shared_between_instances():
+    redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    first = RecommendationCache(redis_client=redis_client)
+    second = RecommendationCache(redis_client=redis_client)
+
+    async def scenario():
+        await first.set("k", [make_response("shared")])
+        return await second.get("k")
+
+    value = asyncio.run(scenario())
+    assert value[0].name == "shared"
+    assert second.redis_hits == 1
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from app.config import DATA_FILE, NUMERIC_FEATURE_COLS
+from app.service.catalog import Catalog, StringTable, CATALOG_NUMERIC_COLS, dataset_version
+from app.service.recommender import FragranceRecommender
+from app.model.schemas import TimePreference, SeasonPreference
+
+
+@pytest.fixture(scope="module")
+def csv_catalog():
+    return Catalog.from_csv(DATA_FILE)
+
+
+def test_string_table_round_trip():
+    strings = ["Oudh 36", "", "Eau de Parfum – Été", "Creed "]
+    table = StringTable.from_strings(strings)
+    assert len(table) == 4
+    assert table.tolist() == strings
+    assert table[2] == "Eau de Parfum – Été"
+
+
+def test_catalog_matches_csv(csv_catalog):
+    df = csv_catalog.to_dataframe()
+    assert len(csv_catalog) == len(df)
+    assert csv_catalog.version == dataset_version(DATA_FILE)
+    for col in CATALOG_NUMERIC_COLS:
+        assert csv_catalog[col].flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(
+        np.linalg.norm(csv_catalog.features, axis=1)[np.any(df[NUMERIC_FEATURE_COLS] != 0, axis=1)], 1, rtol=1e-5
+    )
+
+
+def test_save_and_load_is_memory_mapped(csv_catalog, tmp_path):
+    directory = tmp_path / "catalog"
+    csv_catalog.save(directory)
+    loaded = Catalog.load(directory)
+    assert loaded.version == csv_catalog.version
+    assert not loaded.numeric.flags["WRITEABLE"]
+    np.testing.assert_array_equal(loaded.numeric, csv_catalog.numeric)
+    np.testing.assert_array_equal(loaded.features, csv_catalog.features)
+    assert loaded.names.tolist() == csv_catalog.names.tolist()
+    assert loaded.notes[10] == csv_catalog.notes[10]
+
+
+def test_open_ignores_stale_artifact(csv_catalog, tmp_path):
+    directory = tmp_path / "catalog"
+    stale = Catalog(
+        csv_catalog.numeric, csv_catalog.features, csv_catalog.names,
+        csv_catalog.brands, csv_catalog.notes, version="stale",
+    )
+    stale.save(directory)
+    assert Catalog.open(DATA_FILE, directory).version == csv_catalog.version
+    assert Catalog.open(DATA_FILE, tmp_path / "missing").version == csv_catalog.version
+
+
+def test_recommender_from_artifact_matches_csv(csv_catalog, tmp_path):
+    directory = tmp_path / "catalog"
+    csv_catalog.save(directory)
+    from_csv = FragranceRecommender(csv_catalog)
+    from_artifact = FragranceRecommender(Catalog.load(directory))
+    vector = from_csv.build_user_profile(["Oudh 36"])
+    a = from_csv.get_recommendations(vector, TimePreference.day, SeasonPreference.cold, 10, 0.4)
+    b = from_artifact.get_recommendations(vector, TimePreference.day, SeasonPreference.cold, 10, 0.4)
+    assert [r.model_dump() for r in a] == [r.model_dump() for r in b]
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.model.schemas import TimePreference, SeasonPreference
+from app.service.executor import RecommendationExecutor, RecommenderBusy
+
+
+class BlockingRecommender:
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def wait(self):
+        self.started.set()
+        self.release.wait(5)
+        return "done"
+
+    def items(self, n):
+        for i in range(n):
+            yield i
+
+
+@pytest.mark.parametrize("kind", ["thread", "inline"])
+def test_executor_matches_direct_call(recommender, kind):
+    executor = RecommendationExecutor(recommender, kind=kind, workers=2)
+    args = (["Oudh 36"], TimePreference.night, SeasonPreference.cold, 5, 0.3)
+    try:
+        result = asyncio.run(executor.run("get_recommendations_by_names", *args))
+    finally:
+        executor.shutdown()
+    assert result == recommender.get_recommendations_by_names(*args)
+    assert executor.in_flight == 0
+
+
+def test_process_executor(recommender):
+    executor = RecommendationExecutor(recommender, kind="process", workers=1)
+    try:
+        result = asyncio.run(executor.run(
+            "get_recommendations_by_accords", {"Floral": 0.9}, TimePreference.day, SeasonPreference.hot, 4
+        ))
+    finally:
+        executor.shutdown()
+    expected = recommender.get_recommendations_by_accords({"Floral": 0.9}, TimePreference.day, SeasonPreference.hot, 4)
+    assert [r.name for r in result] == [r.name for r in expected]
+
+
+@pytest.mark.parametrize("kind", ["thread", "inline"])
+def test_stream_holds_a_slot_until_drained(kind):
+    executor = RecommendationExecutor(BlockingRecommender(), kind=kind, workers=1, max_in_flight=1)
+
+    async def scenario():
+        stream = executor.stream_on(executor.recommender, "items", 3)
+        assert executor.in_flight == 1
+        with pytest.raises(RecommenderBusy):
+            executor.stream_on(executor.recommender, "items", 3)
+        with pytest.raises(RecommenderBusy):
+            await executor.run("wait")
+        items = [item async for item in stream]
+        assert executor.in_flight == 0
+        return items
+
+    try:
+        assert asyncio.run(scenario()) == [0, 1, 2]
+    finally:
+        executor.shutdown()
+
+
+def test_unstarted_stream_releases_its_slot():
+    executor = RecommendationExecutor(BlockingRecommender(), kind="thread", workers=1, max_in_flight=1)
+    stream = executor.stream_on(executor.recommender, "items", 3)
+    assert executor.in_flight == 1
+    del stream
+    assert executor.in_flight == 0
+    executor.shutdown()
+
+
+def test_batch_by_names_matches_profile_batch(recommender):
+    args = ([TimePreference.day, TimePreference.night], [SeasonPreference.hot, SeasonPreference.cold], [4, 2], [0.0, 0.3])
+    liked = [["Oudh 36"], ["Oudh 36", "Acqua di Parma Blu Mediterraneo - Cipresso di Toscana"]]
+    expected = recommender.get_batch_recommendations([recommender.build_user_profile(names) for names in liked], *args)
+    assert recommender.get_batch_recommendations_by_names(liked, *args) == expected
+
+
+def test_executor_sheds_load_when_saturated():
+    blocking = BlockingRecommender()
+    executor = RecommendationExecutor(blocking, kind="thread", workers=1, max_in_flight=1)
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run("wait"))
+        await asyncio.get_running_loop().run_in_executor(None, blocking.started.wait, 5)
+        with pytest.raises(RecommenderBusy):
+            await executor.run("wait")
+        blocking.release.set()
+        return await first
+
+    try:
+        assert asyncio.run(scenario()) == "done"
+    finally:
+        executor.shutdown()
+    assert executor.stats()["rejected"] == 1
+    assert executor.in_flight == 0
+
+
+def test_unknown_executor_kind(recommender):
+    with pytest.raises(ValueError):
+        RecommendationExecutor(recommender, kind="gpu")
+
+
+def test_process_workers_follow_a_swapped_dataset(recommender, tmp_path):
+    from app.config import DATA_FILE
+    from app.service.snapshot import load_recommender
+    subset = tmp_path / "fragrances.csv"
+    subset.write_text("".join(DATA_FILE.read_text(encoding="utf-8").splitlines(keepends=True)[:101]), encoding="utf-8")
+    swapped = load_recommender(subset)
+    executor = RecommendationExecutor(recommender, kind="process", workers=1)
+    args = ({"Floral": 0.9}, TimePreference.day, SeasonPreference.hot, 4)
+
+    async def scenario():
+        before = await executor.run("get_recommendations_by_accords", *args)
+        after = await executor.run_on(swapped, "get_recommendations_by_accords", *args)
+        return before, after
+
+    try:
+        before, after = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert [r.name for r in before] == [r.name for r in recommender.get_recommendations_by_accords(*args)]
+    assert [r.name for r in after] == [r.name for r in swapped.get_recommendations_by_accords(*args)]
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from app.model.schemas import (
+    RecommendationFilters, RecommendationRequest, GenderLabel, PriceValueLabel,
+    TimePreference, SeasonPreference,
+)
+from app.service.cache import RecommendationCache
+from app.service.recommender import FragranceRecommender
+from app.service.retrieval import IVFRetriever
+
+
+def test_label_masks_match_response_labels(recommender):
+    masks = recommender.attribute_masks
+    catalog = recommender.catalog
+    for row in range(len(catalog)):
+        values = catalog.row(row)
+        assert masks.gender[GenderLabel(recommender.get_gender_label(values["gender_score"]))][row]
+        assert masks.price[PriceValueLabel(recommender.format_price_value(values["priceValue_score"]))][row]
+    assert sum(m.sum() for m in masks.gender.values()) == len(catalog)
+
+
+def test_empty_filters_produce_no_mask(recommender):
+    assert recommender.attribute_masks.mask(None) is None
+    assert recommender.attribute_masks.mask(RecommendationFilters()) is None
+
+
+def test_combined_mask(recommender):
+    filters = RecommendationFilters(
+        genders=["Unisex", "Masculine"], exclude_brands=["Dior"], min_rating=4.0, min_rating_count=100,
+    )
+    mask = recommender.attribute_masks.mask(filters)
+    df = recommender.df
+    expected = (
+        df["gender_score"].between(-0.3, 0.9, inclusive="right")
+        & (df["brand"].str.strip() != "Dior")
+        & (df["ratingValue"] >= 4.0)
+        & (df["ratingCount"] >= 100)
+    ).to_numpy()
+    np.testing.assert_array_equal(mask, expected)
+
+
+def test_unknown_brand_matches_nothing(recommender):
+    mask = recommender.attribute_masks.mask(RecommendationFilters(include_brands=["No Such Brand"]))
+    assert not mask.any()
+    recs = recommender.get_recommendations_by_names(
+        ["Oudh 36"], TimePreference.both, SeasonPreference.both, filters=RecommendationFilters(include_brands=["No Such Brand"])
+    )
+    assert recs == []
+
+
+@pytest.mark.parametrize("diversity", [0.0, 0.4])
+def test_filtered_recommendations_fill_top_k(recommender, diversity):
+    filters = RecommendationFilters(genders=["Feminine", "Very Feminine"], min_rating=4.0)
+    recs = recommender.get_recommendations_by_names(
+        ["Oudh 36"], TimePreference.night, SeasonPreference.cold, top_k=10,
+        diversity_factor=diversity, filters=filters,
+    )
+    assert len(recs) == 10
+    assert all(r.gender_label in ("Feminine", "Very Feminine") and r.rating_value >= 4.0 for r in recs)
+
+
+def test_filtered_ranking_matches_post_filtered_ranking(recommender):
+    filters = RecommendationFilters(exclude_brands=["Nishane"], min_rating_count=50)
+    unfiltered = recommender.get_recommendations_by_accords(
+        {"Floral": 1.0}, TimePreference.both, SeasonPreference.both, top_k=20
+    )
+    allowed = [r.name for r in unfiltered if r.brand.strip() != "Nishane" and r.rating_count >= 50]
+    filtered = recommender.get_recommendations_by_accords(
+        {"Floral": 1.0}, TimePreference.both, SeasonPreference.both, top_k=5, filters=filters
+    )
+    assert [r.name for r in filtered] == allowed[:5]
+
+
+def test_ivf_respects_mask(recommender):
+    ivf = FragranceRecommender(recommender.catalog, retriever=IVFRetriever(recommender.feature_matrix, n_lists=16, n_probe=4))
+    filters = RecommendationFilters(price_values=["Good Value", "Excellent Value"])
+    vector = recommender.build_user_profile(["Oudh 36"])
+    batch = ivf.get_batch_recommendations(
+        [vector, vector], [TimePreference.both] * 2, [SeasonPreference.both] * 2, [5, 5], [0.0, 0.0],
+        filters=[filters, None],
+    )
+    assert all(r.price_value_label in ("Good Value", "Excellent Value") for r in batch[0])
+    assert len(batch[1]) == 5
+
+
+def test_cache_key_includes_filters():
+    cache = RecommendationCache()
+    cache.bind_version("v")
+    plain = RecommendationRequest(liked_fragrances=["A"])
+    filtered = RecommendationRequest(liked_fragrances=["A"], filters={"genders": ["Unisex", "Feminine"]})
+    reordered = RecommendationRequest(liked_fragrances=["A"], filters={"genders": ["Feminine", "Unisex"]})
+    empty = RecommendationRequest(liked_fragrances=["A"], filters={})
+    assert cache.fragrance_key(plain) != cache.fragrance_key(filtered)
+    assert cache.fragrance_key(filtered) == cache.fragrance_key(reordered)
+    assert cache.fragrance_key(plain) == cache.fragrance_key(empty)
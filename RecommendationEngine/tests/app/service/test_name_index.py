@@ -0,0 +1,41 @@
+import numpy as np
+from app.service.name_index import NameIndex, bounded_edit_distance, normalize
+
+
+NAMES = ["Aventus", "Aventus Cologne", "Oudh 36", "Oudh 36 ", "Eau Sauvage", "Été Sauvage"]
+BRANDS = ["Creed", "Creed", "Al Haramain Perfumes", "Other", "Dior", "Alexandria Fragrances"]
+
+
+def test_normalize_strips_case_accents_and_spacing():
+    assert normalize("  Été   SAUVAGE ") == "ete sauvage"
+
+
+def test_bounded_edit_distance():
+    assert bounded_edit_distance("sauvge", "sauvage", 1) == 1
+    assert bounded_edit_distance("avetus", "aventus", 2) == 1
+    assert bounded_edit_distance("abc", "xyz", 1) == 2
+    assert bounded_edit_distance("aven", "aventus", 0, prefix=True) == 0
+
+
+def test_rows_for_uses_stripped_names():
+    index = NameIndex(NAMES, BRANDS)
+    np.testing.assert_array_equal(index.rows_for(["Oudh 36"]), [2, 3])
+    np.testing.assert_array_equal(index.rows_for(["Aventus", "Aventus", "Unknown"]), [0])
+    assert len(index.rows_for(["Unknown"])) == 0
+
+
+def test_prefix_search_matches_brand_and_word_starts():
+    index = NameIndex(NAMES, BRANDS)
+    assert index.search("aven") == [("Creed", "Aventus"), ("Creed", "Aventus Cologne")]
+    assert index.search("creed aventus c") == [("Creed", "Aventus Cologne")]
+    assert index.search("36") == [("Al Haramain Perfumes", "Oudh 36"), ("Other", "Oudh 36")]
+    assert index.search("ete") == [("Alexandria Fragrances", "Été Sauvage")]
+    assert index.search("aven", limit=1) == [("Creed", "Aventus")]
+    assert index.search("   ") == []
+
+
+def test_fuzzy_search_tolerates_typos():
+    index = NameIndex(NAMES, BRANDS)
+    assert index.search("avetus") == []
+    assert ("Creed", "Aventus") in index.search("avetus", fuzzy=True)
+    assert index.search("dior sauvge", fuzzy=True) == [("Dior", "Eau Sauvage")]
@@ -0,0 +1,51 @@
+import pytest
+from app.offline.neighbours import build_neighbour_table
+from app.service.neighbours import NeighbourTable, PREFERENCE_GRID
+
+
+@pytest.fixture(scope="module")
+def table(recommender):
+    names = ["Oudh 36"] + sorted(recommender.valid_names)[:20]
+    return build_neighbour_table(recommender, top_n=10, workers=0, names=names)
+
+
+def test_table_shape(recommender, table):
+    assert table.indices.shape == (21, len(PREFERENCE_GRID), 10)
+    assert table.version == recommender.dataset_version
+
+
+def test_lookup_matches_live_scoring(recommender, table):
+    name = "Oudh 36"
+    for time_pref, season_pref in PREFERENCE_GRID:
+        rows, scores = table.lookup(name, time_pref, season_pref, 5)
+        live = recommender.get_recommendations(
+            recommender.build_user_profile([name]), time_pref, season_pref, top_k=5
+        )
+        expected = [(r.brand, r.name) for r in live]
+        assert list(zip(recommender.df["brand"].iloc[rows], recommender.df["name"].iloc[rows])) == expected
+        assert scores.tolist() == [r.match_score for r in live]
+
+
+def test_lookup_misses(table):
+    assert table.lookup("Unknown Fragrance", "day", "hot", 5) is None
+    assert table.lookup("Oudh 36", "day", "hot", 11) is None
+
+
+def test_save_and_load_round_trip(table, tmp_path):
+    path = tmp_path / "neighbours.npz"
+    table.save(path)
+    loaded = NeighbourTable.load(path, table.version)
+    assert loaded.rows == table.rows
+    assert (loaded.indices == table.indices).all()
+    assert NeighbourTable.load(path, "other-version") is None
+    assert NeighbourTable.load(tmp_path / "missing.npz", table.version) is None
+
+
+def test_table_hit_answers_like_live_scoring(recommender, table):
+    with_table = type(recommender)(recommender.catalog)
+    with_table.neighbours = table
+    without_table = type(recommender)(recommender.catalog)
+    without_table.neighbours = None
+    for time_pref, season_pref in PREFERENCE_GRID:
+        args = (["Oudh 36"], time_pref, season_pref, 5)
+        assert with_table.get_recommendations_by_names(*args) == without_table.get_recommendations_by_names(*args)
@@ -65,3 +65,54 @@ def test_get_recommendations_by_accords_valid(recommender):
         assert hasattr(res, 'name')
         assert hasattr(res, 'brand')
         assert hasattr(res, 'match_score')
+
+def reference_mmr_re_rank(vectors, relevance, k, lambda_):
+    sim_mat = (vectors @ vectors.T).astype(np.float64)
+    selected, remaining = [], list(range(len(relevance)))
+    while len(selected) < k and remaining:
+        if not selected:
+            best = remaining[0]
+        else:
+            mmr_scores = [
+                lambda_ * relevance[idx] - (1 - lambda_) * sim_mat[idx, selected].max()
+                for idx in remaining
+            ]
+            best = remaining[int(np.argmax(mmr_scores))]
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+@pytest.mark.parametrize("lambda_", [0.0, 0.3, 0.7, 1.0])
+@pytest.mark.parametrize("k", [1, 5, 20, 250])
+def test_mmr_re_rank_matches_reference(recommender, lambda_, k):
+    rng = np.random.default_rng(k)
+    pool = rng.choice(len(recommender.df), 200, replace=False)
+    relevance = np.sort(rng.uniform(0, 1, 200))[::-1]
+    vectors = recommender.feature_matrix[pool]
+    picks = FragranceRecommender.mmr_re_rank(vectors, relevance, k, lambda_)
+    assert picks.tolist() == reference_mmr_re_rank(vectors, relevance, k, lambda_)
+
+def test_mmr_re_rank_empty_pool():
+    picks = FragranceRecommender.mmr_re_rank(np.empty((0, 3), dtype=np.float32), np.empty(0), 5, 0.5)
+    assert len(picks) == 0
+
+def test_batch_recommendations_match_single(recommender):
+    names = sorted(recommender.valid_names)[:4]
+    vectors = [recommender.build_user_profile([name]) for name in names]
+    time_prefs = [TimePreference.day, TimePreference.night, TimePreference.both, TimePreference.day]
+    season_prefs = [SeasonPreference.hot, SeasonPreference.cold, SeasonPreference.both, SeasonPreference.both]
+    top_ks = [5, 3, 10, 1]
+    diversity_factors = [0.0, 0.5, 0.2, 1.0]
+    batch = recommender.get_batch_recommendations(vectors, time_prefs, season_prefs, top_ks, diversity_factors)
+    assert len(batch) == 4
+    for i, results in enumerate(batch):
+        single = recommender.get_recommendations(
+            vectors[i], time_prefs[i], season_prefs[i], top_ks[i], diversity_factors[i]
+        )
+        assert [(r.brand, r.name) for r in results] == [(r.brand, r.name) for r in single]
+        assert [r.match_score for r in results] == pytest.approx([r.match_score for r in single])
+
+def test_build_user_profile_resolves_untrimmed_names(recommender):
+    untrimmed = next(name for name in recommender.names if name != name.strip())
+    vector = recommender.build_user_profile([untrimmed.strip()])
+    assert np.all(np.isfinite(vector))
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from app.model.schemas import TimePreference, SeasonPreference
+from app.service.recommender import FragranceRecommender
+from app.service.retrieval import ExactRetriever, IVFRetriever, build_retriever
+from app.service.scoring import l2_normalize
+
+
+@pytest.fixture(scope="module")
+def features():
+    rng = np.random.default_rng(0)
+    return l2_normalize(rng.normal(size=(2000, 15)))
+
+
+def test_exact_retriever_scans_everything(features):
+    query = features[3]
+    rows, sims = ExactRetriever(features).search(query)
+    assert rows is None
+    np.testing.assert_array_equal(sims, features @ query)
+
+
+def test_ivf_full_probe_is_exact(features):
+    ivf = IVFRetriever(features, n_lists=20, n_probe=20)
+    query = features[7]
+    rows, sims = ivf.search(query)
+    np.testing.assert_array_equal(rows, np.arange(len(features)))
+    np.testing.assert_allclose(sims, features @ query, rtol=1e-5, atol=1e-6)
+
+
+def test_ivf_partial_probe_and_extra_rows(features):
+    ivf = IVFRetriever(features, n_lists=20, n_probe=2)
+    query = features[11]
+    extra = np.array([0, 1, 2])
+    rows, sims = ivf.search(query, extra_rows=extra)
+    assert len(rows) < len(features)
+    assert set(extra) <= set(rows.tolist())
+    assert 11 in rows
+    assert np.all(np.diff(rows) > 0)
+    np.testing.assert_allclose(sims, features[rows] @ query, rtol=1e-5, atol=1e-6)
+
+
+def test_list_max(features):
+    ivf = IVFRetriever(features, n_lists=10)
+    values = np.arange(len(features), dtype=np.float64)
+    expected = [values[ivf.assignments == i].max() for i in range(ivf.n_lists)]
+    np.testing.assert_array_equal(ivf.list_max(values), expected)
+
+
+def test_list_max_skips_nan_rows(features):
+    ivf = IVFRetriever(features, n_lists=10)
+    values = np.arange(len(features), dtype=np.float64)
+    values[ivf.order[ivf.offsets[3]]] = np.nan
+    expected = [np.nanmax(values[ivf.assignments == i]) for i in range(ivf.n_lists)]
+    np.testing.assert_array_equal(ivf.list_max(values), expected)
+
+
+def test_ivf_probes_lists_holding_nan_rated_rows(recommender):
+    features = recommender.feature_matrix
+    unrated = np.flatnonzero(np.isnan(np.asarray(recommender.catalog["ratingValue"], dtype=np.float64)))
+    assert len(unrated)
+    ivf = FragranceRecommender(recommender.catalog, retriever=IVFRetriever(features, n_lists=16, n_probe=1))
+    hints = ivf._retrieval_hints(TimePreference.both, SeasonPreference.both, 0.0)
+    assert not np.isnan(hints["list_bonus"]).any()
+    seed = unrated[0]
+    rows, _ = ivf.retriever.search(features[seed], **hints)
+    assert seed in rows
+
+
+def test_build_retriever(features):
+    assert build_retriever(features, backend="auto", min_rows=len(features) + 1).exact
+    assert not build_retriever(features, backend="auto", min_rows=len(features), n_lists=8).exact
+    with pytest.raises(ValueError):
+        build_retriever(features, backend="hnsw")
+
+
+def test_ivf_recommender_matches_exact_with_full_probe(recommender):
+    features = recommender.feature_matrix
+    ivf = FragranceRecommender(recommender.catalog, retriever=IVFRetriever(features, n_lists=16, n_probe=16))
+    vector = recommender.build_user_profile(["Oudh 36"])
+    for diversity in (0.0, 0.5):
+        exact = recommender.get_recommendations(vector, TimePreference.night, SeasonPreference.cold, 8, diversity)
+        approx = ivf.get_recommendations(vector, TimePreference.night, SeasonPreference.cold, 8, diversity)
+        assert [r.name for r in approx] == [r.name for r in exact]
+        np.testing.assert_allclose([r.match_score for r in approx], [r.match_score for r in exact])
+
+    batch = ivf.get_batch_recommendations(
+        [vector, vector], [TimePreference.day, TimePreference.both],
+        [SeasonPreference.hot, SeasonPreference.both], [5, 3], [0.0, 0.3],
+    )
+    assert [len(recs) for recs in batch] == [5, 3]
@@ -0,0 +1,67 @@
+import pytest
+import numpy as np
+from app.service.scoring import ScoringEngine, l2_normalize, top_k_indices
+from app.model.schemas import TimePreference, SeasonPreference
+
+
+def reference_scores(df, sims, time_pref, season_pref, diversity_factor):
+    temp = df.copy()
+    temp["similarity"] = sims
+    temp["rating_score"] = (temp["ratingValue"] * temp["ratingCount"] + 30.0) / (temp["ratingCount"] + 10)
+    if time_pref == TimePreference.both:
+        temp["time_match"] = 1.0
+    else:
+        sign = 1 if time_pref == TimePreference.day else -1
+        temp["time_match"] = (sign * temp["timeOfDay_score"] + 2) / 4
+    if season_pref == SeasonPreference.both:
+        temp["season_match"] = 1.0
+    else:
+        sign = -1 if season_pref == SeasonPreference.cold else 1
+        temp["season_match"] = (sign * temp["season_score"] + 2) / 4
+    for col in ["rating_score", "priceValue_score"]:
+        temp[f"{col}_norm"] = (temp[col] - temp[col].min()) / (temp[col].max() - temp[col].min() + 1e-9)
+    sim_w = 0.35 * (1 - diversity_factor)
+    return (
+        sim_w * temp["similarity"]
+        + 0.20 * temp["rating_score_norm"]
+        + 0.15 * temp["priceValue_score_norm"]
+        + 0.15 * temp["time_match"]
+        + 0.15 * temp["season_match"]
+    ).to_numpy()
+
+
+@pytest.mark.parametrize("time_pref", list(TimePreference))
+@pytest.mark.parametrize("season_pref", list(SeasonPreference))
+def test_final_scores_match_row_wise_formula(recommender, time_pref, season_pref):
+    df = recommender.df
+    sims = np.random.default_rng(0).uniform(-1, 1, len(df))
+    engine = ScoringEngine(df)
+    expected = reference_scores(df, sims, time_pref, season_pref, 0.3)
+    actual = engine.final_scores(sims, time_pref, season_pref, 0.3)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual[~np.isnan(actual)], expected[~np.isnan(expected)], rtol=0, atol=1e-12)
+
+
+def test_static_components_are_contiguous(recommender):
+    engine = ScoringEngine(recommender.df)
+    for arr in [engine.rating_component, engine.price_component,
+                *engine.time_components.values(), *engine.season_components.values()]:
+        assert arr.flags["C_CONTIGUOUS"]
+        assert arr.shape == (len(recommender.df),)
+
+
+def test_l2_normalize_is_float32_unit_rows():
+    matrix = np.array([[3.0, 4.0], [0.0, 0.0], [1.0, 0.0]])
+    normalized = l2_normalize(matrix)
+    assert normalized.dtype == np.float32
+    assert normalized.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(normalized, [[0.6, 0.8], [0.0, 0.0], [1.0, 0.0]], rtol=1e-6)
+
+
+def test_top_k_indices_matches_full_sort():
+    scores = np.random.default_rng(1).normal(size=1000)
+    scores[[5, 50]] = np.nan
+    expected = np.argsort(-scores, kind="stable")[:30]
+    np.testing.assert_array_equal(top_k_indices(scores, 30), expected)
+    assert len(top_k_indices(scores, 5000)) == 1000
+    assert set(top_k_indices(scores, 1000)[-2:]) == {5, 50}
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from app.config import DATA_FILE
+from app.model.schemas import TimePreference, SeasonPreference
+from app.service.catalog import Catalog, dataset_version
+from app.service.snapshot import DatasetSnapshot, SnapshotManager, resolve_source, source_version
+
+
+def write_subset(path, n_rows):
+    lines = DATA_FILE.read_text(encoding="utf-8").splitlines(keepends=True)
+    path.write_text("".join(lines[:n_rows + 1]), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def small_csv(tmp_path):
+    return write_subset(tmp_path / "fragrances.csv", 300)
+
+
+def test_snapshot_from_csv_and_artifact(small_csv, tmp_path):
+    from_csv = DatasetSnapshot.load(small_csv)
+    assert from_csv.version == dataset_version(small_csv) == source_version(small_csv)
+    assert from_csv.rows == 300
+
+    directory = tmp_path / "catalog"
+    Catalog.from_csv(small_csv).save(directory)
+    from_artifact = DatasetSnapshot.load(directory)
+    assert from_artifact.version == from_csv.version
+    assert from_artifact.source == directory
+
+
+def test_drop_directory_uses_newest_csv(tmp_path):
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    assert resolve_source(drop) is None
+    write_subset(drop / "a.csv", 100)
+    newest = write_subset(drop / "b.csv", 200)
+    assert resolve_source(drop) == newest
+    assert DatasetSnapshot.load(drop).rows == 200
+
+
+def test_reload_swaps_and_keeps_old_snapshot_usable(small_csv):
+    manager = SnapshotManager(snapshot=DatasetSnapshot.load(small_csv))
+    swapped = []
+    manager.on_swap(swapped.append)
+    old = manager.current
+    name = old.recommender.names[0]
+
+    assert asyncio.run(manager.reload(small_csv)) is None
+    assert manager.current is old and swapped == []
+
+    write_subset(small_csv, 150)
+    new = asyncio.run(manager.reload(small_csv))
+    assert manager.current is new and swapped == [new]
+    assert new.version != old.version and new.rows == 150
+    # A request that started before the swap still completes on its snapshot.
+    assert old.recommender.get_recommendations_by_names([name], TimePreference.day, SeasonPreference.hot, 5)
+    assert manager.info()["reloads"] == 1
+
+
+def test_watch_picks_up_changes_and_survives_bad_files(small_csv):
+    manager = SnapshotManager(snapshot=DatasetSnapshot.load(small_csv))
+
+    async def scenario():
+        watcher = asyncio.create_task(manager.watch(small_csv, interval=0.01))
+        try:
+            small_csv.write_text("name,brand\nbroken,row\n", encoding="utf-8")
+            while manager.reload_errors == 0:
+                await asyncio.sleep(0.01)
+            write_subset(small_csv, 120)
+            while manager.current.rows != 120:
+                await asyncio.sleep(0.01)
+        finally:
+            watcher.cancel()
+
+    asyncio.run(asyncio.wait_for(scenario(), 30))
+    assert manager.current.version == dataset_version(small_csv)
+    assert manager.info()["reload_errors"] == 1
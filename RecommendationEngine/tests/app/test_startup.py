@@ -0,0 +1,13 @@
+import json
+import subprocess
+import sys
+from app.config import BASE_DIR
+
+
+def test_serving_path_does_not_import_heavy_libraries():
+    code = (
+        "import json, sys; import app.main; "
+        "print(json.dumps([m for m in ('pandas', 'sklearn', 'scipy') if m in sys.modules]))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
@@ -1,8 +1,30 @@
+import os
+import threading
+
+# Limits are scaled before app.config is imported, so tests exercise the
+# routes without spending their production budgets; tests/app/api/
+# test_rate_limit.py covers the limits themselves.
+os.environ.setdefault("RATE_LIMIT_SCALE", "1000")
+
 import pytest
+from fakeredis import TcpFakeServer
 from fastapi.testclient import TestClient
 from app.main import app
 from app.service.recommender import FragranceRecommender
 
+@pytest.fixture(scope="session", autouse=True)
+def redis_url():
+    # A private Redis for every app the tests start, so reruns never see
+    # earlier counters or cached responses.
+    server = TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("REDIS_URL", f"redis://{host}:{port}/0")
+        yield f"redis://{host}:{port}/0"
+    server.shutdown()
+    server.server_close()
+
 @pytest.fixture(scope="module")
 def client():
     with TestClient(app) as c: